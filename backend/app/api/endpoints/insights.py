@@ -1,13 +1,77 @@
+import asyncio
+import logging
+import orjson
+from cachetools import TTLCache
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, Optional
-from pydantic import BaseModel
-from ...services.ai_insights_service import ai_insights_service
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple, Union
+from pydantic import BaseModel, ConfigDict
+from ...core.cache import SingleFlight, get_redis
+from ...core.config import settings
+from ...services.ai_insights_service import FallbackInsights, InsightsQuotaError, ai_insights_service
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Shared cap on concurrent insight generations (LLM + Google calls) across all requests
+INSIGHTS_SEM = asyncio.Semaphore(settings.insights_max_concurrency)
+
+# Insights for the same address/price band are near-identical, so reuse them for an hour
+INSIGHTS_CACHE_TTL = 3600
+PRICE_BUCKET_SIZE = 250
+
+_insights_cache: TTLCache = TTLCache(maxsize=10_000, ttl=INSIGHTS_CACHE_TTL)
+_insights_flight = SingleFlight()
+
+
+def _insights_cache_key(property_data: Dict[str, Any], search_criteria: Dict[str, Any]) -> Tuple:
+    """
+    Canonical tuple of the inputs that actually change the generated insights
+
+    City/state/type have very low cardinality and price is bucketed, so most
+    calls collapse onto a small set of keys. Bedrooms is part of the prompt;
+    bathrooms and square footage are not, so they are left out.
+    """
+    price = property_data.get("price")
+
+    return (
+        (property_data.get("city") or "").strip().lower(),
+        (property_data.get("state") or "").strip().lower(),
+        (property_data.get("address") or "").strip().lower(),  # Commute insight is per property address
+        property_data.get("property_type"),
+        None if price is None else int(price // PRICE_BUCKET_SIZE),
+        property_data.get("bedrooms"),
+        search_criteria.get("search_type"),
+    )
+
+
+async def _get_property_insights(property_data: Dict[str, Any], search_criteria: Dict[str, Any]) -> Dict[str, str]:
+    """Return cached insights, or generate them once even if requested concurrently"""
+    key = _insights_cache_key(property_data, search_criteria)
+
+    cached = _insights_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def generate() -> Dict[str, str]:
+        async with INSIGHTS_SEM:
+            insights = await ai_insights_service.generate_property_insights(
+                property_data=property_data,
+                search_criteria=search_criteria
+            )
+        # Fallback text stands in for a failed lookup; retry it on the next request
+        if not isinstance(insights, FallbackInsights):
+            _insights_cache[key] = insights
+        return insights
+
+    return await _insights_flight.do(key, generate)
 
 
 class PropertyInsightRequest(BaseModel):
     """Request model for generating property insights"""
+    model_config = ConfigDict(extra="ignore", frozen=True, str_strip_whitespace=True)
+
     city: str
     state: str
     address: Optional[str] = None  # Full street address for more precise location data
@@ -19,15 +83,42 @@ class PropertyInsightRequest(BaseModel):
     search_type: Optional[str] = "rent"
 
 
+class BatchPropertyInsightRequest(PropertyInsightRequest):
+    """A property in a batch request, tagged with its listing id"""
+    id: Optional[Union[int, str]] = None
+
+
+class BatchInsightRequest(BaseModel):
+    """Request model for generating insights for a page of properties"""
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
+    properties: List[BatchPropertyInsightRequest]
+    search_type: str = "rent"
+
+
+# Request fields forwarded to the AI service as property_data
+PROPERTY_DATA_FIELDS = {
+    "city", "state", "address", "price", "bedrooms", "bathrooms", "square_feet", "property_type"
+}
+
+
 class PropertyInsightResponse(BaseModel):
-    """Response model for property insights"""
+    """Response model for property insights (documents the shape; not re-validated)"""
+    model_config = ConfigDict(frozen=True)
+
     neighborhood: str
     commute: str
     lifestyle: str
     schools: str
 
 
-@router.post("/property-insights", response_model=PropertyInsightResponse)
+# The service already returns this shape, so skip FastAPI's response re-validation
+# and jsonable_encoder pass; the model is kept only for the OpenAPI schema
+@router.post(
+    "/property-insights",
+    response_model=None,
+    responses={200: {"model": PropertyInsightResponse}},
+)
 async def generate_property_insights(request: PropertyInsightRequest):
     """
     Generate AI-powered insights for a property card
@@ -39,33 +130,28 @@ async def generate_property_insights(request: PropertyInsightRequest):
     - 🎓 Schools: Education quality and family considerations
     """
     try:
-        # Convert request to property data dict
-        property_data = {
-            "city": request.city,
-            "state": request.state,
-            "address": request.address,  # Include full address for precise location
-            "price": request.price,
-            "bedrooms": request.bedrooms,
-            "bathrooms": request.bathrooms,
-            "square_feet": request.square_feet,
-            "property_type": request.property_type
-        }
+        # Convert request to property data dict (includes full address for precise location)
+        property_data = request.model_dump(include=PROPERTY_DATA_FIELDS)
 
-        print(f"🎯 INSIGHTS.PY RECEIVED: address={request.address}, city={request.city}, state={request.state}")
-        print(f"🎯 PROPERTY_DATA DICT: {property_data}")
+        logger.debug(
+            "Insights request received: address=%s city=%s state=%s",
+            request.address, request.city, request.state
+        )
 
         search_criteria = {
             "search_type": request.search_type
         }
 
-        # Generate insights using AI service
-        insights = await ai_insights_service.generate_property_insights(
-            property_data=property_data,
-            search_criteria=search_criteria
-        )
+        # Generate insights using AI service (cached + deduplicated)
+        insights = await _get_property_insights(property_data, search_criteria)
 
-        return PropertyInsightResponse(**insights)
+        return insights
 
+    except InsightsQuotaError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Insights are temporarily unavailable: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -73,47 +159,105 @@ async def generate_property_insights(request: PropertyInsightRequest):
         )
 
 
-@router.get("/property-insights/batch")
-async def generate_batch_insights(
-    properties: str,  # JSON string of property list
-    search_type: str = "rent"
-):
+@router.post("/property-insights/stream")
+async def stream_property_insights(request: PropertyInsightRequest):
     """
-    Generate insights for multiple properties (for search results)
+    Stream the 4 insights as newline-delimited JSON, one {field: insight} per line
 
-    Args:
-        properties: JSON string containing array of property objects
-        search_type: "rent" or "buy"
+    Each line is sent as soon as GPT finishes writing it, so a card can show
+    its neighborhood insight before the schools insight has been generated.
     """
-    import json
+    property_data = request.model_dump(include=PROPERTY_DATA_FIELDS)
+    search_criteria = {"search_type": request.search_type}
+
+    return StreamingResponse(
+        _stream_property_insights(property_data, search_criteria),
+        media_type="application/x-ndjson"
+    )
+
 
+async def _stream_property_insights(
+    property_data: Dict[str, Any],
+    search_criteria: Dict[str, Any]
+) -> AsyncIterator[bytes]:
+    """NDJSON lines for one property; served from the insights cache when possible"""
+    key = _insights_cache_key(property_data, search_criteria)
+
+    cached = _insights_cache.get(key)
+    if cached is not None:
+        for field, text in cached.items():
+            yield orjson.dumps({field: text}) + b"\n"
+        return
+
+    insights: Dict[str, str] = {}
+    degraded = False
     try:
-        property_list = json.loads(properties)
-        results = []
+        async with INSIGHTS_SEM:
+            async for insight in ai_insights_service.generate_property_insights_stream(
+                property_data, search_criteria
+            ):
+                insights.update(insight)
+                degraded = degraded or isinstance(insight, FallbackInsights)
+                yield orjson.dumps(insight) + b"\n"
+    except Exception as e:
+        logger.exception("Insights stream failed")
+        yield orjson.dumps({"error": str(e)}) + b"\n"
+        return
 
-        for prop in property_list:
-            property_data = {
-                "city": prop.get("city", ""),
-                "state": prop.get("state", ""),
-                "address": prop.get("address"),  # Include full address for precise location
-                "price": prop.get("price"),
-                "bedrooms": prop.get("bedrooms"),
-                "bathrooms": prop.get("bathrooms"),
-                "square_feet": prop.get("square_feet"),
-                "property_type": prop.get("property_type", "property")
-            }
+    # Same rule as _get_property_insights: fallback lines are not memoized
+    if not degraded:
+        _insights_cache[key] = insights
 
-            search_criteria = {"search_type": search_type}
 
-            insights = await ai_insights_service.generate_property_insights(
-                property_data=property_data,
-                search_criteria=search_criteria
-            )
+@router.post("/property-insights/batch")
+async def generate_batch_insights(request: BatchInsightRequest):
+    """
+    Generate insights for multiple properties (for search results)
 
-            results.append({
-                "property_id": prop.get("id"),
-                "insights": insights
-            })
+    Body:
+        properties: array of property objects (same fields as /property-insights, plus id)
+        search_type: "rent" or "buy"
+    """
+    try:
+        property_list = request.properties
+        search_criteria = {"search_type": request.search_type}
+
+        # Fan out all properties concurrently in a TaskGroup: the service turns most
+        # upstream errors into fallback text, but an LLM rate limit or exhausted quota
+        # raises InsightsQuotaError and cancels the remaining siblings instead of
+        # spending more upstream calls on a batch that is already failing
+        tasks: List[asyncio.Task] = []
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [
+                    tg.create_task(
+                        _get_property_insights(prop.model_dump(include=PROPERTY_DATA_FIELDS), search_criteria)
+                    )
+                    for prop in property_list
+                ]
+        except* InsightsQuotaError as eg:
+            logger.warning("Batch insights aborted after %d quota failure(s)", len(eg.exceptions))
+
+        # Partial success: keep whatever finished before the batch was aborted
+        results = []
+        for prop, task in zip(property_list, tasks):
+            if task.cancelled():
+                results.append({
+                    "property_id": prop.id,
+                    "insights": None,
+                    "error": "Cancelled after another property in the batch failed"
+                })
+            elif task.exception() is not None:
+                results.append({
+                    "property_id": prop.id,
+                    "insights": None,
+                    "error": str(task.exception())
+                })
+            else:
+                results.append({
+                    "property_id": prop.id,
+                    "insights": task.result()
+                })
 
         return {"insights": results}
 
@@ -121,4 +265,51 @@ async def generate_batch_insights(
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate batch insights: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/property-insights/precompute")
+async def precompute_batch_insights(request: BatchInsightRequest):
+    """
+    Queue insights for many properties through the OpenAI Batch API (background jobs)
+
+    Cheaper than the online path but finishes within 24h; poll the returned
+    batch_id with GET /property-insights/precompute/{batch_id} to store results
+    in the cache that interactive requests read.
+    """
+    if not ai_insights_service.client:
+        raise HTTPException(status_code=503, detail="OpenAI API key not configured")
+    # Batch results are only ever stored in Redis; without it they would be dropped
+    if get_redis() is None:
+        raise HTTPException(status_code=503, detail="Redis cache not enabled")
+
+    try:
+        batch_id = await ai_insights_service.enqueue_batch_insights(
+            [prop.model_dump(include=PROPERTY_DATA_FIELDS) for prop in request.properties],
+            {"search_type": request.search_type}
+        )
+        return {"batch_id": batch_id}
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to queue batch insights: {str(e)}"
+        )
+
+
+@router.get("/property-insights/precompute/{batch_id}")
+async def collect_precomputed_insights(batch_id: str):
+    """Store a finished precompute batch's insights; returns the batch status"""
+    if not ai_insights_service.client:
+        raise HTTPException(status_code=503, detail="OpenAI API key not configured")
+    if get_redis() is None:
+        raise HTTPException(status_code=503, detail="Redis cache not enabled")
+
+    try:
+        return await ai_insights_service.collect_batch_insights(batch_id)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to collect batch insights: {str(e)}"
+        )
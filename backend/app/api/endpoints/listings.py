@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List
 from ...core.database import get_db
 from ...models.listing import Listing
 
@@ -8,18 +11,31 @@ from ...models.listing import Listing
 
 
 # @router.get("/listings")
-router = APIRouter(prefix="/listings", tags=["listings"])
+router = APIRouter(prefix="/listings", tags=["listings"], default_response_class=ORJSONResponse)
 
 @router.get("")
 
-async def get_listings(
+def get_listings(
     limit: int = 10,
     offset: int = 0,
     db: Session = Depends(get_db)
 ):
-    """Get all listings from database with pagination"""
-    listings = db.query(Listing).offset(offset).limit(limit).all()
-    total = db.query(Listing).count()
+    """Get all listings from database with pagination
+
+    Declared sync so FastAPI runs the blocking SQLAlchemy calls in its threadpool
+    """
+    # Fetch the page and the total row count in one round-trip via COUNT(*) OVER ()
+    rows = (
+        db.query(Listing, func.count().over().label("total"))
+        .order_by(Listing.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    listings = [row[0] for row in rows]
+
+    # An empty page (offset past the end) carries no window count, so count directly
+    total = rows[0][1] if rows else db.query(Listing).count()
 
     return {
         "listings": listings,
@@ -30,19 +46,90 @@ async def get_listings(
 
 
 @router.post("/listings/{listing_id}/analyze")
-async def analyze_listing(
+def analyze_listing(
     listing_id: int,
     db: Session = Depends(get_db)
 ):
-    """Generate AI analysis (pros/cons) for a specific listing"""
-    listing = db.query(Listing).filter(Listing.id == listing_id).first()
+    """Generate AI analysis (pros/cons) for a specific listing
+
+    Declared sync so the commit's blocking round-trip runs in FastAPI's threadpool
+    """
+    # Only the title feeds the analysis: load that column, not a full ORM object
+    row = db.execute(select(Listing.title).where(Listing.id == listing_id)).first()
 
-    if not listing:
+    if row is None:
         raise HTTPException(status_code=404, detail="Listing not found")
 
-    # Placeholder for AI analysis - will implement with OpenAI later
-    ai_analysis = {
-        "summary": f"Analysis for {listing.title}",
+    ai_analysis = _build_analysis(row.title)
+
+    # Update listing with AI analysis in a single UPDATE; no ORM state to flush
+    db.execute(
+        update(Listing)
+        .where(Listing.id == listing_id)
+        .values(
+            ai_summary=ai_analysis["summary"],
+            pros=ai_analysis["pros"],
+            cons=ai_analysis["cons"]
+        )
+    )
+    db.commit()
+
+    return {
+        "listing_id": listing_id,
+        "analysis": ai_analysis,
+        "message": "AI analysis generated successfully"
+    }
+
+
+class AnalyzeListingsRequest(BaseModel):
+    """Request model for analyzing several listings at once"""
+    listing_ids: List[int]
+
+
+@router.post("/analyze")
+def analyze_listings(
+    request: AnalyzeListingsRequest,
+    db: Session = Depends(get_db)
+):
+    """Generate AI analysis for several listings and persist them in one commit"""
+    listing_ids = list(dict.fromkeys(request.listing_ids))
+
+    # Only the columns the analysis needs, in one query
+    rows = db.execute(
+        select(Listing.id, Listing.title).where(Listing.id.in_(listing_ids))
+    ).all()
+
+    analyses = {row.id: _build_analysis(row.title) for row in rows}
+
+    # One executemany UPDATE keyed by primary key instead of a flush per object
+    db.bulk_update_mappings(
+        Listing,
+        [
+            {
+                "id": listing_id,
+                "ai_summary": analysis["summary"],
+                "pros": analysis["pros"],
+                "cons": analysis["cons"],
+            }
+            for listing_id, analysis in analyses.items()
+        ]
+    )
+    db.commit()
+
+    return {
+        "analyses": [
+            {"listing_id": listing_id, "analysis": analysis}
+            for listing_id, analysis in analyses.items()
+        ],
+        "not_found": [listing_id for listing_id in listing_ids if listing_id not in analyses],
+        "message": f"AI analysis generated for {len(analyses)} listings"
+    }
+
+
+def _build_analysis(title: str) -> Dict[str, Any]:
+    """Placeholder for AI analysis - will implement with OpenAI later"""
+    return {
+        "summary": f"Analysis for {title}",
         "pros": [
             "Good location",
             "Reasonable price for the area",
@@ -54,17 +141,3 @@ async def analyze_listing(
             "No recent photos"
         ]
     }
-
-    # Update listing with AI analysis
-    listing.ai_summary = ai_analysis["summary"]
-    listing.pros = ai_analysis["pros"]
-    listing.cons = ai_analysis["cons"]
-
-    db.commit()
-    db.refresh(listing)
-
-    return {
-        "listing_id": listing_id,
-        "analysis": ai_analysis,
-        "message": "AI analysis generated successfully"
-    }
\ No newline at end of file
@@ -1,168 +1,492 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from typing import Optional
-from ...core.database import get_db
+import asyncio
+import base64
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, fields
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Dict, Any, List, AsyncIterator, Awaitable, Callable, Set, Tuple, Union
+from pydantic import BaseModel
+from ...core.cache import SingleFlight, redis_get, redis_setex
+from ...core.database import get_async_db
 from ...models.listing import Listing
-from ...services.realtor_service import fetch_realtor_listings
+from ...services.realtor_service import fetch_realtor_listings, stream_realtor_listings
 
 # router = APIRouter()
 
 # @router.get("/search")
-router = APIRouter(prefix="/search", tags=["search"])
-
-@router.get("")
+router = APIRouter(prefix="/search", tags=["search"], default_response_class=ORJSONResponse)
+
+logger = logging.getLogger(__name__)
+
+# Encoded response bodies for identical search queries; API results go stale faster.
+# Each worker keeps a short in-process copy in front of the shared Redis copy.
+API_SEARCH_CACHE_TTL = 60
+API_SEARCH_SOFT_TTL = 30  # Older API entries are served stale while refreshed in the background
+DB_SEARCH_CACHE_TTL = 300
+API_SEARCH_REDIS_TTL = 900
+DB_SEARCH_REDIS_TTL = 300
+SEARCH_REDIS_PREFIX = "housing-cache:search:"
+_api_search_cache = TTLCache(maxsize=2048, ttl=API_SEARCH_CACHE_TTL)
+_db_search_cache = TTLCache(maxsize=2048, ttl=DB_SEARCH_CACHE_TTL)
+_search_cache_lock = asyncio.Lock()
+_search_flight = SingleFlight()
+_background_refreshes: Set[asyncio.Task] = set()
+
+SEARCH_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+MOCK_SOURCE = "Mock Data (API unavailable)"
+
+# Mock listings returned when the Realtor API is unavailable, built once at import
+MOCK_LISTING_TEMPLATES = (
+    {
+        "id": 1,
+        "title": "Beautiful {br}BR/{br}BA Apartment in {city}",
+        "default_bedrooms": 2,
+        "bedroom_offset": 0,
+        "default_price": 2000,
+        "price_offset": -200,
+        "bathrooms": 2.0,
+        "square_feet": 1200,
+        "description": "Modern apartment located in the heart of {city}. Features updated appliances and great amenities.",
+        "photo_url": "https://images.unsplash.com/photo-1560448204-e02f11c3d0e2?w=400&h=300&fit=crop&auto=format&q=80",
+        "url": "https://example.com/property/1",
+        "street": "123 Main St",
+    },
+    {
+        "id": 2,
+        "title": "Spacious {br}BR/{br}BA House in {city}",
+        "default_bedrooms": 2,
+        "bedroom_offset": 1,
+        "default_price": 2800,
+        "price_offset": 500,
+        "bathrooms": 2.5,
+        "square_feet": 1800,
+        "description": "Charming house with a yard in {city}. Perfect for families looking for space and comfort.",
+        "photo_url": "https://images.unsplash.com/photo-1568605114967-8130f3a36994?w=400&h=300&fit=crop&auto=format&q=80",
+        "url": "https://example.com/property/2",
+        "street": "456 Oak St",
+    },
+    {
+        "id": 3,
+        "title": "Cozy {br}BR/{br}BA Condo in {city}",
+        "default_bedrooms": 1,
+        "bedroom_offset": 0,
+        "default_price": 1600,
+        "price_offset": -400,
+        "bathrooms": 1.0,
+        "square_feet": 900,
+        "description": "Affordable condo in {city} with great access to downtown and public transportation.",
+        "photo_url": "https://images.unsplash.com/photo-1502672260266-1c1ef2d93688?w=400&h=300&fit=crop&auto=format&q=80",
+        "url": "https://example.com/property/3",
+        "street": "789 Pine St",
+    },
+)
+
+
+def _build_mock_listings(
+    city: str,
+    state_code: str,
+    bedrooms: Optional[int],
+    max_price: Optional[float]
+) -> List[Dict[str, Any]]:
+    """Fill the mock listing templates for the requested search"""
+    mock_listings = []
+    for template in MOCK_LISTING_TEMPLATES:
+        br = (bedrooms or template["default_bedrooms"]) + template["bedroom_offset"]
+        mock_listings.append({
+            "id": template["id"],
+            "title": template["title"].format(br=br, city=city),
+            "price": max_price + template["price_offset"] if max_price else template["default_price"],
+            "bedrooms": br,
+            "bathrooms": template["bathrooms"],
+            "square_feet": template["square_feet"],
+            "city": city,
+            "state": state_code,
+            "description": template["description"].format(city=city),
+            "photo_url": template["photo_url"],
+            "url": template["url"],
+            # 🔹 NEW: Mock full address
+            "full_address": f"{template['street']}, {city}, {state_code}"
+        })
+    return mock_listings
+
+
+class ListingOut(BaseModel):
+    """A listing as returned by search (documentation only)"""
+    id: Optional[Union[int, str]] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[float] = None
+    square_feet: Optional[int] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    url: Optional[str] = None
+    full_address: Optional[str] = None
+
+
+class SearchResponse(BaseModel):
+    """Search response shape (documentation only)"""
+    listings: List[ListingOut]
+    count: int
+    source: str
+    filters: Dict[str, Any]
+    next_cursor: Optional[str] = None
+
+
+# Bodies are encoded once with orjson (and cached as bytes), so the models above
+# only describe the response in OpenAPI; nothing is re-validated per request
+@router.get("", response_model=None, responses={200: {"model": SearchResponse}})
 async def search_listings(
+    request: Request,
     city: Optional[str] = Query(None, description="City to search in"),
+    city_contains: Optional[str] = Query(None, description="Substring match on city (local DB search only)"),
     state_code: Optional[str] = Query(None, description="2-letter state code (required for API search)"),
     bedrooms: Optional[int] = Query(None, description="Number of bedrooms"),
     max_price: Optional[float] = Query(None, description="Maximum price (monthly rent for rentals, sale price for purchases)"),
     search_type: str = Query("rent", description="Search type: 'rent' for rentals or 'buy' for purchases"),
-    property_type: Optional[str] = Query(None, description="Property type (apartment, house, condo, townhouse)"),
+    property_type: Optional[str] = Query(None, description="Property type (apartment, house, condo, townhouse); comma-separate to search several"),
     use_api: bool = Query(True, description="Use Realtor API (True) or local DB (False)"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from the previous page (local DB search only)"),
+    limit: int = Query(10, ge=1, le=100, description="Page size (local DB search only)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Search for listings based on criteria.
     Can search via Realtor API or local database.
+    Identical queries are served from a short-lived cache of the encoded response.
     """
 
-    if use_api:
-        if not city or not state_code:
-            raise HTTPException(status_code=400, detail="City and state_code are required for API search")
-
-        try:
-            api_listings = await fetch_realtor_listings(
-                city=city,
-                state_code=state_code,
-                bedrooms=bedrooms,
-                max_price=max_price,
-                search_type=search_type,
-                property_type=property_type
-            )
-
-            # 🔹 NEW: Ensure full address is included for each listing
-            
-
-            return {
-                "listings": api_listings,
-                "count": len(api_listings),
-                "source": "Realtor API",
-                "filters": {
-                    "city": city,
-                    "state_code": state_code,
-                    "bedrooms": bedrooms,
-                    "max_price": max_price,
-                    "search_type": search_type,
-                    "property_type": property_type,
-                }
-            }
-
-        except Exception as e:
-            print(f"API search error: {str(e)}")  # Debug logging
-
-            # Return mock data for testing when API fails
-            mock_listings = [
-                {
-                    "id": 1,
-                    "title": f"Beautiful {bedrooms or 2}BR/{bedrooms or 2}BA Apartment in {city}",
-                    "price": max_price - 200 if max_price else 2000,
-                    "bedrooms": bedrooms or 2,
-                    "bathrooms": 2.0,
-                    "square_feet": 1200,
-                    "city": city,
-                    "state": state_code,
-                    "description": f"Modern apartment located in the heart of {city}. Features updated appliances and great amenities.",
-                    "photo_url": "https://images.unsplash.com/photo-1560448204-e02f11c3d0e2?w=400&h=300&fit=crop&auto=format&q=80",
-                    "url": "https://example.com/property/1",
-                    # 🔹 NEW: Mock full address
-                    "full_address": f"123 Main St, {city}, {state_code}"
-                },
-                {
-                    "id": 2,
-                    "title": f"Spacious {(bedrooms or 2) + 1}BR/{(bedrooms or 2) + 1}BA House in {city}",
-                    "price": (max_price + 500) if max_price else 2800,
-                    "bedrooms": (bedrooms or 2) + 1,
-                    "bathrooms": 2.5,
-                    "square_feet": 1800,
-                    "city": city,
-                    "state": state_code,
-                    "description": f"Charming house with a yard in {city}. Perfect for families looking for space and comfort.",
-                    "photo_url": "https://images.unsplash.com/photo-1568605114967-8130f3a36994?w=400&h=300&fit=crop&auto=format&q=80",
-                    "url": "https://example.com/property/2",
-                    "full_address": f"456 Oak St, {city}, {state_code}"
-                },
-                {
-                    "id": 3,
-                    "title": f"Cozy {bedrooms or 1}BR/{bedrooms or 1}BA Condo in {city}",
-                    "price": (max_price - 400) if max_price else 1600,
-                    "bedrooms": bedrooms or 1,
-                    "bathrooms": 1.0,
-                    "square_feet": 900,
-                    "city": city,
-                    "state": state_code,
-                    "description": f"Affordable condo in {city} with great access to downtown and public transportation.",
-                    "photo_url": "https://images.unsplash.com/photo-1502672260266-1c1ef2d93688?w=400&h=300&fit=crop&auto=format&q=80",
-                    "url": "https://example.com/property/3",
-                    "full_address": f"789 Pine St, {city}, {state_code}"
-                }
-            ]
-
-            return {
-                "listings": mock_listings,
-                "count": len(mock_listings),
-                "source": "Mock Data (API unavailable)",
-                "filters": {
-                    "city": city,
-                    "state_code": state_code,
-                    "bedrooms": bedrooms,
-                    "max_price": max_price,
-                    "search_type": search_type,
-                    "property_type": property_type,
-                }
-            }
+    if use_api and (not city or not state_code):
+        raise HTTPException(status_code=400, detail="City and state_code are required for API search")
+
+    after_id = _decode_cursor(cursor) if cursor else None
+
+    key = (city, city_contains, state_code, bedrooms, max_price, search_type, property_type, use_api, after_id, limit)
+    cache = _api_search_cache if use_api else _db_search_cache
+
+    redis_key = SEARCH_REDIS_PREFIX + ":".join(map(str, key))
+    soft_ttl = API_SEARCH_SOFT_TTL if use_api else DB_SEARCH_CACHE_TTL
+
+    async def run_search(refresh: bool = False) -> Tuple[bytes, Optional[str]]:
+        if use_api:
+            result = await _search_api(city, state_code, bedrooms, max_price, search_type, property_type, refresh)
+        else:
+            # Database-based search (original functionality) on the async engine
+            result = await _search_db(db, city, bedrooms, max_price, after_id, limit, city_contains)
+
+        encoded = orjson.dumps(result)
+
+        # Mock fallback responses are not cached so a recovered API is used right away
+        if result["source"] == MOCK_SOURCE:
+            return encoded, None
+
+        etag = _etag(encoded)
+        async with _search_cache_lock:
+            cache[key] = (encoded, etag, time.monotonic() + soft_ttl)
+        await redis_setex(
+            redis_key, API_SEARCH_REDIS_TTL if use_api else DB_SEARCH_REDIS_TTL, _stamp_body(encoded)
+        )
+        return encoded, etag
+
+    # L1: in-process entries keep the ETag next to the body so hits never re-hash it
+    async with _search_cache_lock:
+        entry = cache.get(key)
+    if entry is not None:
+        body, etag, fresh_until = entry
+        # Stale-while-revalidate: serve the stale API copy now and refresh it
+        # off the request path. DB searches can't: the session is per request.
+        if use_api and time.monotonic() > fresh_until:
+            _refresh_in_background(key, run_search)
+        return _json_response(request, body, etag)
+
+    # L2: shared Redis copy, warming L1 on hit. Freshness counts from when the
+    # body was written, not from when this worker read it
+    stamped = _unstamp_body(await redis_get(redis_key))
+    if stamped is not None:
+        body, age = stamped
+        etag = _etag(body)
+        async with _search_cache_lock:
+            cache[key] = (body, etag, time.monotonic() + soft_ttl - age)
+        if use_api and age > soft_ttl:
+            _refresh_in_background(key, run_search)
+        return _json_response(request, body, etag)
 
+    if use_api:
+        # Concurrent cold requests for the same query share one Realtor API call.
+        # The DB path is not shared: each request owns its own session.
+        body, etag = await _search_flight.do(key, run_search)
     else:
-        # Database-based search (original functionality)
-        query = db.query(Listing)
+        body, etag = await run_search()
+
+    return _json_response(request, body, etag)
+
+
+def _refresh_in_background(key: Tuple, run_search: Callable[..., Awaitable[Any]]) -> None:
+    """
+    Re-run a search without blocking the caller; joins any refresh already in flight
+
+    The refresh bypasses the Realtor service's own caches, so this layer's
+    soft TTL is the one that decides how old a served body can be.
+    """
+    task = asyncio.create_task(_search_flight.do(key, lambda: run_search(refresh=True)))
+    _background_refreshes.add(task)  # Hold a reference until it finishes
+
+    def _done(done: asyncio.Task) -> None:
+        _background_refreshes.discard(done)
+        if not done.cancelled() and done.exception() is not None:
+            logger.warning("Background search refresh failed", exc_info=done.exception())
+
+    task.add_done_callback(_done)
+
+
+def _stamp_body(body: bytes) -> bytes:
+    """Prefix an encoded body with its wall-clock write time for the shared Redis copy"""
+    return b"%.3f\n%s" % (time.time(), body)
+
+
+def _unstamp_body(raw: Optional[bytes]) -> Optional[Tuple[bytes, float]]:
+    """(body, age in seconds) from _stamp_body() output; anything else reads as a miss"""
+    if raw is None:
+        return None
+    written_at, _, body = raw.partition(b"\n")
+    try:
+        return body, max(0.0, time.time() - float(written_at))
+    except ValueError:
+        return None
+
+
+def _encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    """Turn an opaque next_cursor back into the last seen id; garbage is a 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except ValueError:
+        # binascii.Error and UnicodeEncodeError are both ValueErrors
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _etag(body: bytes) -> str:
+    return '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+def _json_response(request: Request, body: bytes, etag: Optional[str]) -> Response:
+    """
+    Wrap an encoded search body with HTTP caching headers
 
-        if city:
-            query = query.filter(Listing.city.ilike(f"%{city}%"))
+    Browsers and CDNs may reuse results for a minute and revalidate with the
+    ETag; a matching If-None-Match gets an empty 304 instead of the body.
+    Bodies without an ETag (mock fallbacks) are marked no-store.
+    """
+    if etag is None:
+        return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-store"})
+
+    headers = {"Cache-Control": SEARCH_CACHE_CONTROL, "ETag": etag}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _search_api(
+    city: str,
+    state_code: str,
+    bedrooms: Optional[int],
+    max_price: Optional[float],
+    search_type: str,
+    property_type: Optional[str],
+    refresh: bool = False,
+) -> Dict[str, Any]:
+    """Search the Realtor API, falling back to mock listings if it fails"""
+    filters = {
+        "city": city,
+        "state_code": state_code,
+        "bedrooms": bedrooms,
+        "max_price": max_price,
+        "search_type": search_type,
+        "property_type": property_type,
+    }
+
+    try:
+        api_listings = await fetch_realtor_listings(
+            city=city,
+            state_code=state_code,
+            bedrooms=bedrooms,
+            max_price=max_price,
+            search_type=search_type,
+            property_type=property_type,
+            refresh=refresh
+        )
 
-        if bedrooms:
-            query = query.filter(Listing.bedrooms == bedrooms)
+        return {
+            "listings": api_listings,
+            "count": len(api_listings),
+            "source": "Realtor API",
+            "filters": filters,
+        }
 
-        if max_price:
-            query = query.filter(Listing.price <= max_price)
+    except Exception:
+        logger.exception(
+            "API search failed for %s, %s", city, state_code,
+            extra={"city": city, "state_code": state_code}
+        )
 
-        listings = query.limit(10).all()
+        # Return mock data for testing when API fails
+        mock_listings = _build_mock_listings(city, state_code, bedrooms, max_price)
 
         return {
-            "listings": [
-                {
-                    "id": listing.id,
-                    "title": listing.title,
-                    "description": listing.description,
-                    "price": listing.price,
-                    "bedrooms": listing.bedrooms,
-                    "bathrooms": listing.bathrooms,
-                    "square_feet": listing.square_feet,
-                    "city": listing.city,
-                    "state": listing.state,
-                    "url": listing.source_url,
-                    # 🔹 NEW: Build address from DB fields
-                    "full_address": f"{listing.title}, {listing.city}, {listing.state}"
-                } for listing in listings
-            ],
-            "count": len(listings),
-            "source": "Local Database",
-            "filters": {
-                "city": city,
-                "bedrooms": bedrooms,
-                "max_price": max_price
-            }
+            "listings": mock_listings,
+            "count": len(mock_listings),
+            "source": MOCK_SOURCE,
+            "filters": filters,
         }
 
 
+@router.get("/stream")
+async def stream_search_listings(
+    city: str = Query(..., description="City to search in"),
+    state_code: str = Query(..., description="2-letter state code"),
+    bedrooms: Optional[int] = Query(None, description="Number of bedrooms"),
+    max_price: Optional[float] = Query(None, description="Maximum price (monthly rent for rentals, sale price for purchases)"),
+    search_type: str = Query("rent", description="Search type: 'rent' for rentals or 'buy' for purchases"),
+    property_type: Optional[str] = Query(None, description="Property type (apartment, house, condo, townhouse); comma-separate to search several"),
+):
+    """
+    Stream Realtor API listings as newline-delimited JSON (one listing per line).
+    Clients can render each card as soon as its line arrives.
+    """
+    listings = stream_realtor_listings(
+        city=city,
+        state_code=state_code,
+        bedrooms=bedrooms,
+        max_price=max_price,
+        search_type=search_type,
+        property_type=property_type
+    )
+    return StreamingResponse(_ndjson(listings), media_type="application/x-ndjson")
+
+
+async def _ndjson(items: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode each item as one NDJSON line; report upstream failures as a final error line"""
+    try:
+        async for item in items:
+            yield orjson.dumps(item) + b"\n"
+    except Exception as e:
+        logger.exception("API stream failed")
+        yield orjson.dumps({"error": str(getattr(e, "detail", e))}) + b"\n"
+
+
+@dataclass(slots=True)
+class ListingRow:
+    """
+    One DB search result
+
+    orjson encodes slotted dataclasses natively, so rows go straight from the
+    cursor tuple to JSON without an intermediate dict per row.
+    """
+    id: int
+    title: Optional[str]
+    description: Optional[str]
+    price: Optional[float]
+    bedrooms: Optional[int]
+    bathrooms: Optional[float]
+    square_feet: Optional[int]
+    city: Optional[str]
+    state: Optional[str]
+    url: Optional[str]
+    full_address: Optional[str]  # 🔹 NEW: Address built from DB fields
+
+
+# Selected in ListingRow field order so each row maps positionally
+LISTING_ROW_COLUMNS = tuple(getattr(Listing, field.name) for field in fields(ListingRow))
+
+
+def _prefix_match(column, prefix: str) -> tuple:
+    """
+    Case-insensitive prefix conditions for a CITEXT/NOCASE column
+
+    The [prefix, next-prefix) range is what a btree can seek on; the LIKE
+    keeps the result exact where the collation orders the range loosely.
+    The bumped character is ASCII-folded first, since NOCASE compares
+    'Z' as 'z' but the character after 'Z' ('[') sorts below it.
+    """
+    last = prefix[-1].lower() if prefix[-1].isascii() else prefix[-1]
+    conditions = [column >= prefix, column.startswith(prefix, autoescape=True)]
+    if ord(last) < 0x10FFFF:
+        conditions.append(column < prefix[:-1] + chr(ord(last) + 1))
+    return tuple(conditions)
+
+
+async def _search_db(
+    db: AsyncSession,
+    city: Optional[str],
+    bedrooms: Optional[int],
+    max_price: Optional[float],
+    after_id: Optional[int] = None,
+    limit: int = 10,
+    city_contains: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Async SQLAlchemy search; the query yields to the event loop while waiting
+
+    Pages are keyset-paginated on the primary key: each page seeks past the
+    last returned id instead of scanning and discarding OFFSET rows.
+    """
+    # Select only the returned columns: plain rows, no ORM objects or identity map
+    stmt = select(*LISTING_ROW_COLUMNS)
+
+    # City is a case-insensitive column, so a prefix is a plain range seek on
+    # ix_listings_city; a leading wildcard cannot use any btree, so substring
+    # search is opt-in
+    if city:
+        stmt = stmt.where(*_prefix_match(Listing.city, city))
+
+    if city_contains:
+        stmt = stmt.where(Listing.city.icontains(city_contains, autoescape=True))
+
+    if bedrooms:
+        stmt = stmt.where(Listing.bedrooms == bedrooms)
+
+    if max_price:
+        stmt = stmt.where(Listing.price <= max_price)
+
+    if after_id is not None:
+        stmt = stmt.where(Listing.id > after_id)
+
+    # One extra row tells us whether another page exists
+    rows = (await db.execute(stmt.order_by(Listing.id).limit(limit + 1))).all()
+
+    listings = [ListingRow(*row) for row in rows[:limit]]
+    next_cursor = _encode_cursor(listings[-1].id) if len(rows) > limit else None
+
+    return {
+        "listings": listings,
+        "count": len(listings),
+        "next_cursor": next_cursor,
+        "source": "Local Database",
+        "filters": {
+            "city": city,
+            "city_contains": city_contains,
+            "bedrooms": bedrooms,
+            "max_price": max_price
+        }
+    }
+
 
 
 # from fastapi import APIRouter, Depends, Query, HTTPException
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import struct
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import orjson
+import redis.asyncio as aioredis
+from cachetools import TTLCache
+from redis.exceptions import RedisError
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_redis: Optional[aioredis.Redis] = None
+
+# Geocode values are two little-endian float64s: 16 bytes instead of a JSON string
+_COORDS = struct.Struct("<dd")
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one upstream call"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+    async def do(self, key: Hashable, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run coro_factory() once per key; concurrent callers await the same result
+
+        The shared task is shielded so one caller being cancelled does not
+        cancel the work the other callers are waiting on; once the last
+        waiting caller is cancelled the shared task is cancelled too.
+        """
+        task = self._inflight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(coro_factory())
+            self._inflight[key] = task
+
+            def _forget(done: asyncio.Task) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            task.add_done_callback(_forget)
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """Shared Redis client for cross-worker caching, or None when disabled"""
+    global _redis
+    if not settings.redis_cache_enabled:
+        return None
+    if _redis is None:
+        # Short timeouts: a missing Redis should cost a cache miss, not a slow request
+        _redis = aioredis.from_url(
+            settings.redis_url,
+            socket_connect_timeout=0.5,
+            socket_timeout=0.5
+        )
+    return _redis
+
+
+async def close_redis() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+async def redis_get(key: str) -> Optional[bytes]:
+    """GET that treats any Redis failure as a miss"""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return await client.get(key)
+    except RedisError:
+        logger.debug("Redis GET failed for %s", key, exc_info=True)
+        return None
+
+
+async def redis_setex(key: str, ttl: int, value: bytes) -> bool:
+    """SETEX that never fails the caller; returns whether the value was written"""
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        await client.setex(key, ttl, value)
+        return True
+    except RedisError:
+        logger.debug("Redis SETEX failed for %s", key, exc_info=True)
+        return False
+
+
+def pack_coords(coords: Sequence[float]) -> bytes:
+    """Encode (lat, lng) for the shared "geo:" Redis keys"""
+    return _COORDS.pack(coords[0], coords[1])
+
+
+def unpack_coords(raw: bytes) -> Optional[Tuple[float, float]]:
+    """Decode pack_coords() output; anything else (e.g. an old JSON entry) reads as a miss"""
+    if len(raw) != _COORDS.size:
+        return None
+    return _COORDS.unpack(raw)
+
+
+class LayeredCache:
+    """
+    In-process TTL cache in front of the shared Redis cache
+
+    Values are stored in Redis under prefix + key, as JSON unless a dumps/loads
+    pair is given. A Redis failure, or a value loads() returns None for, reads
+    as a miss, so callers simply fall through to the live lookup.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        ttl: int,
+        maxsize: int = 10_000,
+        dumps: Callable[[Any], bytes] = orjson.dumps,
+        loads: Callable[[bytes], Any] = orjson.loads
+    ):
+        self.prefix = prefix
+        self.ttl = ttl
+        self._local: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._dumps = dumps
+        self._loads = loads
+
+    async def get(self, key: str) -> Any:
+        value = self._local.get(key)
+        if value is not None:
+            return value
+
+        raw = await redis_get(self.prefix + key)
+        if raw is None:
+            return None
+
+        value = self._loads(raw)
+        if value is None:
+            return None
+        self._local[key] = value
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._local[key] = value
+        await redis_setex(self.prefix + key, self.ttl, self._dumps(value))
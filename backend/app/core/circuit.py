@@ -0,0 +1,50 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream API keeps failing
+
+    After `threshold` consecutive failures the circuit opens and allow() returns
+    False for `reset_timeout` seconds, so callers return their fallback at once
+    instead of waiting out a timeout. After that a single trial call is let
+    through (half-open) while everyone else keeps failing fast: success closes
+    the circuit, another failure re-opens it. A trial that never reports back
+    (e.g. cancelled) is replaced by a new one after another `reset_timeout`.
+    """
+
+    def __init__(self, name: str, threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_at = 0.0
+
+    def allow(self) -> bool:
+        if self._failures < self.threshold:
+            return True
+
+        now = time.monotonic()
+        if now - self._opened_at < self.reset_timeout:
+            return False
+
+        # Half-open: admit one trial call until it records its result
+        if self._trial_at and now - self._trial_at < self.reset_timeout:
+            return False
+        self._trial_at = now
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._trial_at = 0.0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._opened_at = time.monotonic()
+        self._trial_at = 0.0
+        if self._failures == self.threshold:
+            logger.warning("Circuit %s opened after %d consecutive failures", self.name, self._failures)
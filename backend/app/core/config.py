@@ -1,14 +1,27 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional, List
 from pydantic import field_validator
 
 class Settings(BaseSettings):
+    # Read once at startup and never mutated afterwards
+    model_config = SettingsConfigDict(env_file=".env", frozen=True)
+
     # Database
     database_url: str = "sqlite:///./housing_recommender.db"
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # Seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # Seconds before a pooled connection is replaced
+    db_external_pooler: bool = False  # True behind PgBouncer: let it own the pool
+    auto_create_tables: bool = True  # Run create_all at startup; off when migrations own the schema
 
     # API Keys
     estated_api_key: Optional[str] = None
     openai_api_key: Optional[str] = None
+    openai_insights_model: str = "gpt-4o-mini"  # Insight formatting is templated; "gpt-4.1" for comparison
+    openai_max_concurrency: int = 20  # Max concurrent listing analyses per worker
+    openai_requests_per_minute: int = 500  # Listing-analysis request budget per worker, kept under the account RPM
+    openai_tokens_per_minute: int = 200_000  # Listing-analysis token budget per worker, kept under the account TPM
     rapidapi_key: Optional[str] = None
     rapidapi_host: str = "realty-in-us.p.rapidapi.com"
 
@@ -17,13 +30,24 @@ class Settings(BaseSettings):
     google_maps_api_key: Optional[str] = None
     yelp_api_key: Optional[str] = None
     greatschools_api_key: Optional[str] = None
+    google_max_concurrency: int = 20  # Max concurrent Google Maps calls per worker
+    google_endpoint_concurrency: int = 8  # Per-endpoint cap for downtown Places/Geocoding/Distance Matrix calls
+    google_requests_per_second: float = 10.0  # Sustained downtown lookup rate per worker
+
+    # AI Insights
+    insights_max_concurrency: int = 8  # Max concurrent insight generations per worker
+    insights_template_when_complete: bool = True  # Skip GPT when every API field is present
+    downtown_prewarm_cities: int = 50  # Most-listed cities whose downtowns are resolved at startup (0 = off)
 
     # Redis Cache
     redis_url: str = "redis://localhost:6379"
+    redis_cache_enabled: bool = True  # Share response caches across workers via Redis
 
     # App Settings
     app_name: str = "Housing Recommender API"
     debug: bool = False
+    log_level: str = "INFO"
+    threadpool_size: int = 100  # Worker threads for sync endpoints / blocking DB calls
 
     # CORS
     allowed_origins: List[str] = ["http://localhost:3000"]
@@ -37,11 +61,5 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in v.split(",") if origin.strip()]
         return v
 
-    class Config:
-        env_file = ".env"
-
-    def get_allowed_origins(self) -> List[str]:
-        return self.allowed_origins
-
 
 settings = Settings()
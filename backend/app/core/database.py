@@ -1,11 +1,56 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from .config import settings
 
-engine = create_engine(settings.database_url)
+
+def _pool_options(url: str) -> dict:
+    """
+    Connection pool settings shared by the sync and async engines
+
+    Server databases keep a persistent, pre-pinged pool so requests skip the
+    connect handshake and never get a dead connection. SQLite keeps its
+    default pool; behind PgBouncer (transaction mode) pooling is left to it.
+    """
+    if url.startswith("sqlite"):
+        return {"pool_pre_ping": True}
+    if settings.db_external_pooler:
+        return {"poolclass": NullPool}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+    }
+
+
+# Filter values are sent as bound parameters, so each query *shape* compiles once;
+# a larger statement cache keeps every search filter combination resident
+engine = create_engine(settings.database_url, query_cache_size=1200, **_pool_options(settings.database_url))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str) -> str:
+    """Point the configured URL at the asyncio driver for the same database"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+# Async engine for request paths that should not hold a threadpool worker
+# while waiting on the database (e.g. search)
+async_engine = create_async_engine(
+    _async_database_url(settings.database_url),
+    query_cache_size=1200,
+    **_pool_options(settings.database_url)
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -14,4 +59,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,82 @@
+"""
+Major-city downtowns per US state, for the nearest-major-downtown fallback
+
+The set of big downtowns in a state doesn't change, so the fallback picks the
+closest one from this table instead of asking Google Places every time.
+Coordinates are downtown / city-hall centres.
+"""
+
+from typing import Dict, List, Tuple
+
+MAJOR_DOWNTOWNS: Dict[str, List[Tuple[str, float, float]]] = {
+    "AL": [("Birmingham", 33.5186, -86.8104), ("Huntsville", 34.7304, -86.5861), ("Montgomery", 32.3792, -86.3077), ("Mobile", 30.6954, -88.0399)],
+    "AK": [("Anchorage", 61.2181, -149.9003), ("Fairbanks", 64.8378, -147.7164), ("Juneau", 58.3019, -134.4197)],
+    "AZ": [("Phoenix", 33.4484, -112.0740), ("Tucson", 32.2226, -110.9747), ("Mesa", 33.4152, -111.8315), ("Flagstaff", 35.1983, -111.6513)],
+    "AR": [("Little Rock", 34.7465, -92.2896), ("Fayetteville", 36.0626, -94.1574), ("Fort Smith", 35.3859, -94.3985)],
+    "CA": [
+        ("Los Angeles", 34.0522, -118.2437), ("San Francisco", 37.7749, -122.4194), ("San Diego", 32.7157, -117.1611),
+        ("San Jose", 37.3382, -121.8863), ("Sacramento", 38.5816, -121.4944), ("Fresno", 36.7378, -119.7871),
+        ("Oakland", 37.8044, -122.2712), ("Long Beach", 33.7701, -118.1937), ("Bakersfield", 35.3733, -119.0187),
+        ("Riverside", 33.9806, -117.3755),
+    ],
+    "CO": [("Denver", 39.7392, -104.9903), ("Colorado Springs", 38.8339, -104.8214), ("Fort Collins", 40.5853, -105.0844), ("Boulder", 40.0150, -105.2705)],
+    "CT": [("Hartford", 41.7658, -72.6734), ("New Haven", 41.3083, -72.9279), ("Stamford", 41.0534, -73.5387), ("Bridgeport", 41.1865, -73.1952)],
+    "DE": [("Wilmington", 39.7391, -75.5398), ("Dover", 39.1582, -75.5244)],
+    "DC": [("Washington", 38.9072, -77.0369)],
+    "FL": [
+        ("Miami", 25.7617, -80.1918), ("Orlando", 28.5383, -81.3792), ("Tampa", 27.9506, -82.4572),
+        ("Jacksonville", 30.3322, -81.6557), ("Fort Lauderdale", 26.1224, -80.1373), ("Tallahassee", 30.4383, -84.2807),
+        ("St. Petersburg", 27.7676, -82.6403), ("Pensacola", 30.4213, -87.2169),
+    ],
+    "GA": [("Atlanta", 33.7490, -84.3880), ("Savannah", 32.0809, -81.0912), ("Augusta", 33.4735, -82.0105), ("Macon", 32.8407, -83.6324)],
+    "HI": [("Honolulu", 21.3069, -157.8583), ("Hilo", 19.7241, -155.0868)],
+    "ID": [("Boise", 43.6150, -116.2023), ("Idaho Falls", 43.4917, -112.0339), ("Coeur d'Alene", 47.6777, -116.7805)],
+    "IL": [("Chicago", 41.8781, -87.6298), ("Springfield", 39.7817, -89.6501), ("Peoria", 40.6936, -89.5890), ("Rockford", 42.2711, -89.0940)],
+    "IN": [("Indianapolis", 39.7684, -86.1581), ("Fort Wayne", 41.0793, -85.1394), ("Evansville", 37.9716, -87.5711), ("South Bend", 41.6764, -86.2520)],
+    "IA": [("Des Moines", 41.5868, -93.6250), ("Cedar Rapids", 41.9779, -91.6656), ("Davenport", 41.5236, -90.5776)],
+    "KS": [("Wichita", 37.6872, -97.3301), ("Kansas City", 39.1142, -94.6275), ("Topeka", 39.0473, -95.6752), ("Overland Park", 38.9822, -94.6708)],
+    "KY": [("Louisville", 38.2527, -85.7585), ("Lexington", 38.0406, -84.5037), ("Bowling Green", 36.9685, -86.4808)],
+    "LA": [("New Orleans", 29.9511, -90.0715), ("Baton Rouge", 30.4515, -91.1871), ("Shreveport", 32.5252, -93.7502), ("Lafayette", 30.2241, -92.0198)],
+    "ME": [("Portland", 43.6591, -70.2568), ("Bangor", 44.8016, -68.7712)],
+    "MD": [("Baltimore", 39.2904, -76.6122), ("Annapolis", 38.9784, -76.4922), ("Frederick", 39.4143, -77.4105)],
+    "MA": [("Boston", 42.3601, -71.0589), ("Worcester", 42.2626, -71.8023), ("Springfield", 42.1015, -72.5898), ("Cambridge", 42.3736, -71.1097)],
+    "MI": [("Detroit", 42.3314, -83.0458), ("Grand Rapids", 42.9634, -85.6681), ("Lansing", 42.7325, -84.5555), ("Ann Arbor", 42.2808, -83.7430)],
+    "MN": [("Minneapolis", 44.9778, -93.2650), ("St. Paul", 44.9537, -93.0900), ("Rochester", 44.0121, -92.4802), ("Duluth", 46.7867, -92.1005)],
+    "MS": [("Jackson", 32.2988, -90.1848), ("Gulfport", 30.3674, -89.0928), ("Hattiesburg", 31.3271, -89.2903)],
+    "MO": [("Kansas City", 39.0997, -94.5786), ("St. Louis", 38.6270, -90.1994), ("Springfield", 37.2090, -93.2923), ("Columbia", 38.9517, -92.3341)],
+    "MT": [("Billings", 45.7833, -108.5007), ("Missoula", 46.8721, -113.9940), ("Bozeman", 45.6770, -111.0429)],
+    "NE": [("Omaha", 41.2565, -95.9345), ("Lincoln", 40.8136, -96.7026)],
+    "NV": [("Las Vegas", 36.1699, -115.1398), ("Reno", 39.5296, -119.8138), ("Henderson", 36.0395, -114.9817)],
+    "NH": [("Manchester", 42.9956, -71.4548), ("Nashua", 42.7654, -71.4676), ("Concord", 43.2081, -71.5376)],
+    "NJ": [
+        ("Newark", 40.7357, -74.1724), ("Jersey City", 40.7178, -74.0431), ("Trenton", 40.2206, -74.7597),
+        ("Princeton", 40.3573, -74.6672), ("New Brunswick", 40.4862, -74.4518), ("Atlantic City", 39.3643, -74.4229),
+    ],
+    "NM": [("Albuquerque", 35.0844, -106.6504), ("Santa Fe", 35.6870, -105.9378), ("Las Cruces", 32.3199, -106.7637)],
+    "NY": [
+        ("New York", 40.7128, -74.0060), ("Buffalo", 42.8864, -78.8784), ("Rochester", 43.1566, -77.6088),
+        ("Albany", 42.6526, -73.7562), ("Syracuse", 43.0481, -76.1474),
+    ],
+    "NC": [("Charlotte", 35.2271, -80.8431), ("Raleigh", 35.7796, -78.6382), ("Greensboro", 36.0726, -79.7920), ("Durham", 35.9940, -78.8986), ("Asheville", 35.5951, -82.5515)],
+    "ND": [("Fargo", 46.8772, -96.7898), ("Bismarck", 46.8083, -100.7837)],
+    "OH": [("Columbus", 39.9612, -82.9988), ("Cleveland", 41.4993, -81.6944), ("Cincinnati", 39.1031, -84.5120), ("Toledo", 41.6528, -83.5379), ("Dayton", 39.7589, -84.1916)],
+    "OK": [("Oklahoma City", 35.4676, -97.5164), ("Tulsa", 36.1540, -95.9928), ("Norman", 35.2226, -97.4395)],
+    "OR": [("Portland", 45.5152, -122.6784), ("Eugene", 44.0521, -123.0868), ("Salem", 44.9429, -123.0351), ("Bend", 44.0582, -121.3153)],
+    "PA": [("Philadelphia", 39.9526, -75.1652), ("Pittsburgh", 40.4406, -79.9959), ("Harrisburg", 40.2732, -76.8867), ("Allentown", 40.6023, -75.4714)],
+    "RI": [("Providence", 41.8240, -71.4128)],
+    "SC": [("Charleston", 32.7765, -79.9311), ("Columbia", 34.0007, -81.0348), ("Greenville", 34.8526, -82.3940)],
+    "SD": [("Sioux Falls", 43.5446, -96.7311), ("Rapid City", 44.0805, -103.2310)],
+    "TN": [("Nashville", 36.1627, -86.7816), ("Memphis", 35.1495, -90.0490), ("Knoxville", 35.9606, -83.9207), ("Chattanooga", 35.0456, -85.3097)],
+    "TX": [
+        ("Dallas", 32.7767, -96.7970), ("Houston", 29.7604, -95.3698), ("Austin", 30.2672, -97.7431),
+        ("San Antonio", 29.4241, -98.4936), ("Fort Worth", 32.7555, -97.3308), ("El Paso", 31.7619, -106.4850),
+        ("Corpus Christi", 27.8006, -97.3964), ("Lubbock", 33.5779, -101.8552),
+    ],
+    "UT": [("Salt Lake City", 40.7608, -111.8910), ("Provo", 40.2338, -111.6585), ("Ogden", 41.2230, -111.9738), ("St. George", 37.0965, -113.5684)],
+    "VT": [("Burlington", 44.4759, -73.2121), ("Montpelier", 44.2601, -72.5754)],
+    "VA": [("Richmond", 37.5407, -77.4360), ("Virginia Beach", 36.8529, -75.9780), ("Norfolk", 36.8508, -76.2859), ("Arlington", 38.8816, -77.0910), ("Roanoke", 37.2710, -79.9414)],
+    "WA": [("Seattle", 47.6062, -122.3321), ("Spokane", 47.6588, -117.4260), ("Tacoma", 47.2529, -122.4443), ("Bellevue", 47.6101, -122.2015)],
+    "WV": [("Charleston", 38.3498, -81.6326), ("Morgantown", 39.6295, -79.9559), ("Huntington", 38.4192, -82.4452)],
+    "WI": [("Milwaukee", 43.0389, -87.9065), ("Madison", 43.0731, -89.4012), ("Green Bay", 44.5133, -88.0133)],
+    "WY": [("Cheyenne", 41.1400, -104.8202), ("Casper", 42.8501, -106.3252), ("Jackson", 43.4799, -110.7624)],
+}
@@ -1,27 +1,108 @@
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import queue
+from contextlib import asynccontextmanager
+import anyio.to_thread
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from sqlalchemy import func, select
+from .core.cache import close_redis
 from .core.config import settings
-from .core.database import engine, Base
+from .core.database import async_engine, AsyncSessionLocal, Base
 from .api.endpoints import search, listings, insights
+from .models.listing import Listing
+from .services import estated_service, nlp_service
+from .services.ai_insights_service import ai_insights_service
+from .services.downtown_service import downtown_service
+from .services.insights_service import property_insights_service
+from .services.realtor_service import realtor_service
+
+# Request paths only enqueue log records; a background thread formats and writes them
+_log_queue = queue.SimpleQueue()
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream)
+
+# Attached directly rather than via basicConfig, which would give the QueueHandler
+# a formatter of its own and prefix every line twice
+_root_logger = logging.getLogger()
+_root_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_root_logger.setLevel(settings.log_level)
+
+# The handler lives as long as the process, so the listener does too; stopping it
+# at lifespan shutdown would leave a later lifespan (tests) queueing into nothing.
+# atexit runs this before logging's own shutdown, so the queue is drained first
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+
+async def _prewarm_downtowns() -> None:
+    """Resolve downtowns for the cities with the most listings, off the request path"""
+    try:
+        async with AsyncSessionLocal() as db:
+            rows = await db.execute(
+                select(Listing.city, Listing.state)
+                .where(Listing.city.is_not(None), Listing.state.is_not(None))
+                .group_by(Listing.city, Listing.state)
+                .order_by(func.count().desc())
+                .limit(settings.downtown_prewarm_cities)
+            )
+            cities = [(city, state) for city, state in rows]
+        await ai_insights_service.prewarm_downtowns(cities)
+    except Exception:
+        logging.getLogger(__name__).warning("Downtown prewarm failed", exc_info=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync endpoints and DB calls run in anyio's threadpool (default 40 threads)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
+    # Create database tables once per process at startup, not on import;
+    # disable where the schema is managed by migrations
+    if settings.auto_create_tables:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    # Startup doesn't wait on Google; early requests just miss the cache
+    prewarm = asyncio.create_task(_prewarm_downtowns()) if settings.downtown_prewarm_cities else None
+
+    yield
+    if prewarm is not None:
+        prewarm.cancel()
+    await close_redis()
+    await realtor_service.aclose()
+    await ai_insights_service.aclose()
+    await downtown_service.aclose()
+    await property_insights_service.aclose()
+    await estated_service.aclose()
+    await nlp_service.aclose()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.app_name,
     description="AI-powered housing search with smart recommendations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.get_allowed_origins(),
+    allow_origins=settings.allowed_origins,  # Parsed once by the settings validator
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Compress JSON bodies (listing pages run to tens of KB); tiny responses are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Include routers
 app.include_router(
     search.router,
@@ -1,7 +1,17 @@
-from sqlalchemy import Column, Integer, String, Float, Text, JSON
+from sqlalchemy import DDL, Column, Index, Integer, String, Float, Text, JSON, event
+from sqlalchemy.dialects.postgresql import CITEXT
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import column_property
 from ..core.database import Base
 
+# Case-insensitive text without lower() wrappers: CITEXT on Postgres, NOCASE on SQLite.
+# Comparisons fold case natively, so a plain btree on the column serves them.
+CaseInsensitiveString = (
+    String()
+    .with_variant(CITEXT(), "postgresql")
+    .with_variant(String(collation="NOCASE"), "sqlite")
+)
+
 
 class Listing(Base):
     __tablename__ = "listings"
@@ -13,10 +23,30 @@ class Listing(Base):
     bedrooms = Column(Integer)
     bathrooms = Column(Float)
     square_feet = Column(Integer)
-    city = Column(String, index=True)
-    state = Column(String, index=True)
+    city = Column(CaseInsensitiveString)
+    state = Column(String)
     url = Column(String)
     source = Column(String)  # "Estated", "scraper"
     ai_summary = Column(Text)
     pros = Column(JSON)
-    cons = Column(JSON)
\ No newline at end of file
+    cons = Column(JSON)
+
+    # "title, city, state" built by the database as part of the SELECT
+    full_address = column_property(title + ", " + city + ", " + state)
+
+    __table_args__ = (
+        # State/city equality first, then the bedrooms equality and price range;
+        # serves state-scoped lookups. The DB search has no state filter, so its
+        # city prefix goes through ix_listings_city
+        Index("ix_listings_state_city_bed_price", "state", "city", "bedrooms", "price"),
+        # City prefix search is a case-insensitive range seek on this index
+        Index("ix_listings_city", "city"),
+    )
+
+
+# CITEXT lives in a Postgres extension; make sure it exists before the table
+event.listen(
+    Listing.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS citext").execute_if(dialect="postgresql")
+)
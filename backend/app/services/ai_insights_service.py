@@ -1,9 +1,111 @@
+import asyncio
+import hashlib
+import logging
+import random
+import re
+import httpx
 import openai
+import orjson
+from cachetools import TTLCache
 from openai import AsyncOpenAI
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional, Set, Tuple
+from ..core.cache import SingleFlight, pack_coords, redis_get, redis_setex, unpack_coords
 from ..core.config import settings
 from .insights_service import property_insights_service
-from .downtown_service import downtown_service
+from .downtown_service import DowntownInfo, downtown_service
+
+logger = logging.getLogger(__name__)
+
+# Batched insight completions: how long to wait for more properties, and how many per request
+AI_BATCH_WINDOW = 0.02
+AI_BATCH_MAX_SIZE = 8
+
+# Formatted GPT insights cached in Redis by prompt content for a day. Rents are
+# bucketed by $250 and sale prices by $50k so trivially different prices still hit
+AI_CACHE_PREFIX = "aiins:"
+AI_CACHE_TTL = 86400
+AI_CACHE_PRICE_BUCKETS = {"rent": 250, "buy": 50_000}
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
+# Retries for Google's OVER_QUERY_LIMIT before giving up on a call
+GOOGLE_MAX_RETRIES = 3
+
+# Shared geocode cache in Redis; addresses don't move, so keep them for 30 days
+GEO_REDIS_PREFIX = "geo:"
+GEO_REDIS_TTL = 30 * 86400
+
+INSIGHT_DEFAULTS = {
+    "neighborhood": "Neighborhood data unavailable",
+    "commute": "Commute data unavailable",
+    "lifestyle": "Lifestyle data unavailable",
+    "schools": "School data unavailable"
+}
+
+# Structured outputs: the model must return exactly these four string fields,
+# so responses are decoded with orjson instead of scraped line by line
+INSIGHTS_SCHEMA = {
+    "type": "object",
+    "properties": {field: {"type": "string"} for field in INSIGHT_DEFAULTS},
+    "required": list(INSIGHT_DEFAULTS),
+    "additionalProperties": False
+}
+
+BATCH_INSIGHTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, **INSIGHTS_SCHEMA["properties"]},
+                "required": ["id", *INSIGHT_DEFAULTS],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["results"],
+    "additionalProperties": False
+}
+
+# A completed "field": "value" pair in a partially streamed JSON object
+STREAMED_FIELD_RE = re.compile(r'"(neighborhood|commute|lifestyle|schools)"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+INSIGHTS_OUTPUT_FORMAT = """- neighborhood: Brief area description
+- commute: Use exact commute info provided above - do not modify
+- lifestyle: List 2-3 major stores with distance, e.g., "Walmart and Target within 3 miles, 25+ restaurants"
+- schools: School rating/quality"""
+
+# Static instructions live in the system message so every request starts with the
+# same bytes (OpenAI caches repeated prompt prefixes); the user message is only data
+INSIGHTS_SYSTEM_PROMPT = f"""You are a data-driven real estate analyst. From the property and location data provided, write **exactly 4 insights**, short and specific, using exact location names:
+{INSIGHTS_OUTPUT_FORMAT}
+
+**Important: Use the EXACT downtown name provided in the commute data. Do not change it to match the property city.**"""
+
+BATCH_INSIGHTS_SYSTEM_PROMPT = f"""{INSIGHTS_SYSTEM_PROMPT}
+
+Several properties are provided, each introduced by "ID=<n>". Return one result per property with "id" set to its ID."""
+
+# Four short fields plus JSON punctuation fit well under this; decode time scales with it
+INSIGHTS_MAX_TOKENS = 120
+
+
+class MalformedBatchResponse(Exception):
+    """A batched completion did not contain an answer for one of its properties"""
+
+
+class InsightsQuotaError(Exception):
+    """OpenAI rejected a completion for rate limit or quota; not hidden behind fallback text"""
+
+
+class FallbackInsights(dict):
+    """
+    Insights produced because a lookup or completion failed
+
+    Serializes like any other insights dict; the type is the marker callers
+    check so a transient failure is not cached as if it were the real answer.
+    """
 
 
 class AIInsightsService:
@@ -13,18 +115,78 @@ class AIInsightsService:
         if settings.openai_api_key:
             self.client = AsyncOpenAI(api_key=settings.openai_api_key)
         else:
-            print("⚠️ Warning: OpenAI API key not configured")
+            logger.warning("OpenAI API key not configured")
             self.client = None
 
         self.google_api_key = settings.google_maps_api_key
         self.google_places_base = "https://maps.googleapis.com/maps/api/place"
 
+        self._http: Optional[httpx.AsyncClient] = None
+
+        # Caps concurrent Google calls across all properties being processed
+        self._google_sem = asyncio.Semaphore(settings.google_max_concurrency)
+
+        # Geocodes keyed by normalized address; coordinates don't move, so a day is safe
+        self._geo_cache: TTLCache = TTLCache(maxsize=10_000, ttl=86400)
+        self._geo_flight = SingleFlight()
+
+        # Resolved (label, coords) downtown per (city, state); warmed at startup for
+        # the most-listed cities by prewarm_downtowns()
+        self._downtown_cache: TTLCache = TTLCache(maxsize=5_000, ttl=86400)
+
+        # Prompts waiting to be sent together in the next batched completion
+        self._ai_pending: List[Tuple[str, asyncio.Future]] = []
+        self._ai_flush_handle: Optional[asyncio.TimerHandle] = None
+        self._ai_batch_tasks: Set[asyncio.Task] = set()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Shared client so geocoding reuses keep-alive connections to Google
+
+        Google Maps speaks HTTP/2, so concurrent geocodes multiplex over one
+        TLS connection instead of each holding an HTTP/1.1 connection.
+        """
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=60.0)
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
     async def generate_property_insights(
         self,
         property_data: Dict[str, Any],
         search_criteria: Optional[Dict[str, Any]] = None
     ) -> Dict[str, str]:
 
+        city = property_data.get('city', '').strip()
+        state = property_data.get('state', '').strip()
+        property_type = property_data.get('property_type', 'property')
+        search_type = search_criteria.get('search_type', 'rent') if search_criteria else 'rent'
+
+        try:
+            api_insights = await self._collect_insights_data(property_data)
+            if api_insights is None:
+                return FallbackInsights(self._generate_fallback_insights(city, state, property_type, search_type))
+
+            return await self.generate_ai_insights(property_data, api_insights, search_criteria)
+
+        except InsightsQuotaError:
+            # Every other property would hit the same limit; let callers stop early
+            raise
+        except Exception as e:
+            logger.warning("Error generating insights with API data: %s", e)
+            return FallbackInsights(self._generate_fallback_insights(city, state, property_type, search_type))
+
+    async def _collect_insights_data(self, property_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Gather the raw location data (amenities, schools, commute) the prompt is built from"""
+
         city = property_data.get('city', '').strip()
         state = property_data.get('state', '').strip()
         # 🔹 NEW: Try to pull full address directly from property data
@@ -41,26 +203,65 @@ class AIInsightsService:
         if full_address:
             full_address = full_address.strip()
 
-        price = property_data.get('price')
-        bedrooms = property_data.get('bedrooms')
-        property_type = property_data.get('property_type', 'property')
-        search_type = search_criteria.get('search_type', 'rent') if search_criteria else 'rent'
-
         # ------------------------
         # 🔹 FIX 1: Prefer full property address for commute calc
         # ------------------------
         if full_address and full_address != f"{city}, {state}":
-            print(f"🏠 Using full property address for commute: {full_address}")
-            lat, lng = await self._get_coordinates_from_address(full_address)
+            logger.debug("Using full property address for commute: %s", full_address)
             address = full_address
         else:
-            print(f"⚠️ Property missing full address → fallback to city center {city}, {state}")
-            lat, lng = await self._get_coordinates(city, state)
+            logger.debug("Property missing full address, falling back to city center %s, %s", city, state)
             address = f"{city}, {state}"
 
+        lat, lng = await self._geocode(address)
+
         if not lat or not lng:
-            print(f"❌ Could not resolve coordinates for {address}")
-            return self._generate_fallback_insights(city, state, property_type, search_type)
+            logger.info("Could not resolve coordinates for %s", address)
+            return None
+
+        # Amenity/school lookups don't depend on the downtown or commute, so start
+        # them now and run the commute chain alongside instead of after it
+        insights_task = asyncio.create_task(
+            property_insights_service.get_all_insights(
+                address=address, lat=lat, lng=lng, city=city, state=state
+            )
+        )
+
+        try:
+            downtown_label, downtown_coords = await self._resolve_downtown(city, state, lat, lng)
+
+            # Commute calculation per property
+            commute_time = await downtown_service.get_commute_time_to_downtown(
+                lat, lng, downtown_label, downtown_coords
+            )
+
+            api_insights = await insights_task
+
+            # ✅ Inject commute time specific to this property
+            if commute_time:
+                api_insights["commute"] = {
+                    "driving_to_downtown": commute_time  # Already includes "to Princeton Downtown"
+            }
+
+            return api_insights
+
+        finally:
+            # Don't leave the lookups running for a failed or cancelled property
+            if not insights_task.done():
+                insights_task.cancel()
+
+    async def _resolve_downtown(
+        self,
+        city: str,
+        state: str,
+        lat: float,
+        lng: float
+    ) -> DowntownInfo:
+        """Downtown for a city, shared by every property in it once resolved"""
+        key = (city.lower(), state.lower())
+        cached = self._downtown_cache.get(key)
+        if cached is not None:
+            return cached
 
         # ------------------------
         # 🔹 FIX 2: Reject fake/duplicate downtowns (like Denton, Plainsboro)
@@ -70,156 +271,525 @@ class AIInsightsService:
         )
 
         if not downtown_label or "usa" in downtown_label.lower():
-            print(f"⚠️ No valid downtown found for {city}, {state}. Using nearest MAJOR city downtown.")
-            downtown_label, downtown_coords = await downtown_service.find_nearest_major_downtown(
+            logger.debug("No valid downtown found for %s, %s; using nearest major city downtown", city, state)
+            downtown_label, downtown_coords = await downtown_service._find_nearest_major_downtown(
                 city, state, lat, lng
             )
 
-        # Commute calculation per property
-        commute_time = await downtown_service.get_commute_time_to_downtown(
-            lat, lng, downtown_label, downtown_coords
-        )
+        # Without coordinates the lookup failed; let the next property retry it
+        if downtown_coords is not None:
+            self._downtown_cache[key] = DowntownInfo(downtown_label, downtown_coords)
+        return DowntownInfo(downtown_label, downtown_coords)
+
+    async def prewarm_downtowns(self, cities: List[Tuple[str, str]]) -> None:
+        """Resolve downtowns for (city, state) pairs ahead of the first request for them"""
+        async def warm(city: str, state: str) -> None:
+            lat, lng = await self._geocode(f"{city}, {state}")
+            if lat and lng:
+                await self._resolve_downtown(city, state, lat, lng)
+
+        results = await asyncio.gather(*[warm(city, state) for city, state in cities], return_exceptions=True)
+        warmed = sum(1 for result in results if not isinstance(result, BaseException))
+        logger.info("Prewarmed downtowns for %d/%d cities", warmed, len(cities))
+
+    async def generate_ai_insights(
+        self,
+        property_data: Dict[str, Any],
+        insights_data: Dict[str, Any],
+        search_criteria: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, str]:
+        """Use GPT to turn raw API insights into 4 concise property insights"""
+
+        city = property_data.get("city", "").strip()
+        state = property_data.get("state", "").strip()
+
+        # Complete API data reads fine from the template; GPT is only worth it when sparse
+        if settings.insights_template_when_complete and self._is_data_complete(insights_data):
+            return self._generate_data_based_fallback(insights_data, city, state)
+
+        prompt, cache_key = self._build_prompt(property_data, insights_data, search_criteria)
 
         try:
-            api_insights = await property_insights_service.get_all_insights(
-                address=address, lat=lat, lng=lng, city=city, state=state
-            )
+            if not self.client:
+                logger.debug("OpenAI client not configured, falling back to data-based insights")
+                return self._generate_data_based_fallback(insights_data, city, state)
 
-            # ✅ Inject commute time specific to this property
-            if commute_time:
-                api_insights["commute"] = {
-                    "driving_to_downtown": commute_time  # Already includes "to Princeton Downtown"
-            }
+            # Same location data + similar listing -> same insights; skip OpenAI entirely
+            cached = await redis_get(cache_key)
+            if cached is not None:
+                return orjson.loads(cached)
 
-            return await self.generate_ai_insights(property_data, api_insights, search_criteria)
+            # Concurrent properties share one completion; if the model drops this
+            # property from a batched answer, ask for it on its own
+            try:
+                insights = await self._complete_batched(prompt)
+            except MalformedBatchResponse:
+                insights = await self._complete(prompt, max_tokens=INSIGHTS_MAX_TOKENS)
+
+            await redis_setex(cache_key, AI_CACHE_TTL, orjson.dumps(insights))
+            return insights
 
+        except openai.RateLimitError as e:
+            # The client has already retried; covers both 429s and an exhausted quota
+            raise InsightsQuotaError(str(e)) from e
         except Exception as e:
-            print(f"Error generating insights with API data: {e}")
-            return self._generate_fallback_insights(city, state, property_type, search_type)
+            logger.warning("AI formatting error: %s", e)
+            return FallbackInsights(self._generate_data_based_fallback(insights_data, city, state))
 
-    async def generate_ai_insights(
+    async def generate_property_insights_stream(
+        self,
+        property_data: Dict[str, Any],
+        search_criteria: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Streaming generate_property_insights(): yields {field: insight} as each is ready
+
+        Lines filled in because a lookup or the completion failed are FallbackInsights.
+        """
+        city = property_data.get('city', '').strip()
+        state = property_data.get('state', '').strip()
+        property_type = property_data.get('property_type', 'property')
+        search_type = search_criteria.get('search_type', 'rent') if search_criteria else 'rent'
+
+        try:
+            api_insights = await self._collect_insights_data(property_data)
+        except Exception as e:
+            logger.warning("Error generating insights with API data: %s", e)
+            api_insights = None
+
+        if api_insights is None:
+            for field, text in self._generate_fallback_insights(city, state, property_type, search_type).items():
+                yield FallbackInsights({field: text})
+            return
+
+        async for insight in self.generate_ai_insights_stream(property_data, api_insights, search_criteria):
+            yield insight
+
+    async def generate_ai_insights_stream(
         self,
         property_data: Dict[str, Any],
         insights_data: Dict[str, Any],
         search_criteria: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, str]:
-        """Use GPT-4.1 to turn raw API insights into 4 concise property insights"""
+    ) -> AsyncIterator[Dict[str, str]]:
+        """
+        Streaming generate_ai_insights(): yields {field: insight} as each JSON field completes
+
+        Lets the UI show the neighborhood insight while the model is still writing the
+        rest. Streamed completions are not micro-batched; fields the model never
+        produced (or that were cut off by an error) are filled from the fallback.
+        """
+        city = property_data.get("city", "").strip()
+        state = property_data.get("state", "").strip()
+
+        if settings.insights_template_when_complete and self._is_data_complete(insights_data):
+            for field, text in self._generate_data_based_fallback(insights_data, city, state).items():
+                yield {field: text}
+            return
+
+        prompt, cache_key = self._build_prompt(property_data, insights_data, search_criteria)
+
+        if not self.client:
+            logger.debug("OpenAI client not configured, falling back to data-based insights")
+            for field, text in self._generate_data_based_fallback(insights_data, city, state).items():
+                yield {field: text}
+            return
+
+        cached = await redis_get(cache_key)
+        if cached is not None:
+            for field, text in orjson.loads(cached).items():
+                yield {field: text}
+            return
+
+        insights: Dict[str, str] = {}
+        try:
+            stream = await self.client.chat.completions.create(
+                **self._completion_body(prompt, max_tokens=INSIGHTS_MAX_TOKENS), stream=True
+            )
+            buffer = ""
+            scanned = 0
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                buffer += chunk.choices[0].delta.content or ""
+
+                # A field is done once its closing quote arrives; strings still
+                # being written don't match yet and are picked up by a later chunk
+                for match in STREAMED_FIELD_RE.finditer(buffer, scanned):
+                    scanned = match.end()
+                    field = match.group(1)
+                    if field not in insights:
+                        insights[field] = orjson.loads(match.group(2))
+                        yield {field: insights[field]}
 
+        except Exception as e:
+            logger.warning("AI formatting error: %s", e)
+            for field, text in self._generate_data_based_fallback(insights_data, city, state).items():
+                if field not in insights:
+                    yield FallbackInsights({field: text})
+            return
+
+        # Output cut off at max_tokens (or a skipped field): fill the gaps like the
+        # error path and don't cache, just as the non-streaming decode would fail
+        if len(insights) < len(INSIGHT_DEFAULTS):
+            for field, text in self._generate_data_based_fallback(insights_data, city, state).items():
+                if field not in insights:
+                    yield FallbackInsights({field: text})
+            return
+
+        # Same shape as the non-streaming path, so both share the cache
+        await redis_setex(cache_key, AI_CACHE_TTL, orjson.dumps(self._with_defaults(insights)))
+
+    def _build_prompt(
+        self,
+        property_data: Dict[str, Any],
+        insights_data: Dict[str, Any],
+        search_criteria: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, str]:
+        """Return (user message with this property's data, cache key)"""
         city = property_data.get("city", "").strip()
         state = property_data.get("state", "").strip()
         price = property_data.get("price")
         bedrooms = property_data.get("bedrooms")
         search_type = search_criteria.get("search_type", "rent") if search_criteria else "rent"
 
-        prompt = f"""
-You are a real estate expert. Based on the following data, generate **exactly 4 insights**.
-
-Property: {bedrooms or 'N/A'} BR in {city}, {state} - ${price or 'Contact for pricing'} {'/month' if search_type == 'rent' else 'purchase'}
+        property_line = (
+            f"Property: {bedrooms or 'N/A'} BR in {city}, {state} - ${price or 'Contact for pricing'} "
+            f"{'/month' if search_type == 'rent' else 'purchase'}"
+        )
+        data_lines = self._compact_context(insights_data)
+
+        cache_key = self._ai_cache_key(data_lines, city, state, bedrooms, price, search_type)
+        return f"{property_line}\n{data_lines}", cache_key
+
+    def _compact_context(self, insights_data: Dict[str, Any]) -> str:
+        """
+        Only the location facts the 4 insights are written from, as short key=value lines
+
+        Interpolating the raw nested dicts spent most of the prompt on field names,
+        counts and scores the output never mentions.
+        """
+        neighborhood = insights_data.get("neighborhood") or {}
+        walkability = neighborhood.get("walkability") or {}
+        commute = insights_data.get("commute") or {}
+        lifestyle = insights_data.get("lifestyle") or {}
+        schools = insights_data.get("schools") or {}
+
+        school_parts = [f"district={schools.get('district_rating', 'N/A')}/10"]
+        for level in ("elementary", "high"):
+            name = schools.get(f"best_{level}")
+            if name and name != "N/A":
+                school_parts.append(f"{level}={name} ({schools.get(f'best_{level}_rating')}/10)")
+        if schools.get("has_private_options"):
+            school_parts.append("private options")
+
+        return "\n".join((
+            f"Neighborhood: walk={walkability.get('walk_score', 'N/A')} "
+            f"({walkability.get('description', 'N/A')}) safety={neighborhood.get('safety_score', 'N/A')}",
+            f"Commute: {commute.get('driving_to_downtown', 'N/A')}",
+            f"Lifestyle: {lifestyle.get('lifestyle_insight', 'N/A')}; "
+            f"gyms={lifestyle.get('fitness_options', 'N/A')} malls={lifestyle.get('shopping_options', 'N/A')}",
+            f"Schools: {' '.join(school_parts)}",
+        ))
+
+    def _ai_cache_key(
+        self,
+        context: str,
+        city: str,
+        state: str,
+        bedrooms: Optional[int],
+        price: Optional[float],
+        search_type: str
+    ) -> str:
+        """Content hash of everything that goes into the prompt, with price bucketed"""
+        bucket = AI_CACHE_PRICE_BUCKETS.get(search_type, AI_CACHE_PRICE_BUCKETS["buy"])
+        key_data = {
+            "context": context,
+            "city": city.lower(),
+            "state": state.lower(),
+            "bedrooms": bedrooms,
+            "price_bucket": None if price is None else int(price // bucket),
+            "search_type": search_type,
+        }
+        digest = hashlib.blake2b(
+            orjson.dumps(key_data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str),
+            digest_size=16
+        ).hexdigest()
+        return AI_CACHE_PREFIX + digest
 
-**Important: Use the EXACT downtown name provided in the commute data. Do not change it to match the property city.**
+    def _completion_body(
+        self,
+        prompt: str,
+        max_tokens: int,
+        schema: Dict[str, Any] = INSIGHTS_SCHEMA,
+        system_prompt: str = INSIGHTS_SYSTEM_PROMPT
+    ) -> Dict[str, Any]:
+        """Chat completion parameters, shared by online calls and Batch API requests"""
+        return {
+            "model": settings.openai_insights_model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": max_tokens,
+            "temperature": 0.5,
+            "response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": "property_insights", "strict": True, "schema": schema}
+            },
+        }
 
-Neighborhood: {insights_data.get('neighborhood')}
-Commute: {insights_data.get('commute')}
-Lifestyle: {insights_data.get('lifestyle')}
-Schools: {insights_data.get('schools')}
+    async def _complete(self, prompt: str, max_tokens: int) -> Dict[str, str]:
+        response = await self.client.chat.completions.create(**self._completion_body(prompt, max_tokens))
+        return self._parse_insights(response.choices[0].message.content)
 
-Output format (keep short and specific, use exact location names):
-- 🏡 Neighborhood: [Brief area description]
-- 🚗 Commute: [Use exact commute info provided above - do not modify]
-- 🛒 Lifestyle: [List 2-3 major stores with distance, e.g., "Walmart and Target within 3 miles, 25+ restaurants"]
-- 🎓 Schools: [School rating/quality]
-"""
+    async def enqueue_batch_insights(
+        self,
+        properties: List[Dict[str, Any]],
+        search_criteria: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Submit insight generation for many properties through the OpenAI Batch API
+
+        For non-interactive precompute: batch requests cost half as much and don't
+        count against online rate limits, but complete within 24h. Each request is
+        tagged with the online cache key, so collect_batch_insights() can store the
+        results where generate_ai_insights() will find them.
+
+        Returns the batch id, or None if there was nothing to submit.
+        """
+        if not self.client:
+            return None
+
+        collected = await asyncio.gather(
+            *[self._collect_insights_data(property_data) for property_data in properties],
+            return_exceptions=True
+        )
 
+        lines = []
+        seen = set()
+        for property_data, insights_data in zip(properties, collected):
+            if not isinstance(insights_data, dict):
+                continue
+
+            prompt, cache_key = self._build_prompt(property_data, insights_data, search_criteria)
+            if cache_key in seen:
+                continue
+            seen.add(cache_key)
+
+            lines.append(orjson.dumps({
+                "custom_id": cache_key,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._completion_body(prompt, max_tokens=INSIGHTS_MAX_TOKENS),
+            }))
+
+        if not lines:
+            return None
+
+        batch_file = await self.client.files.create(
+            file=("insights.jsonl", b"\n".join(lines)),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info("Submitted insights batch %s with %d properties", batch.id, len(lines))
+        return batch.id
+
+    async def collect_batch_insights(self, batch_id: str) -> Dict[str, Any]:
+        """Store a finished batch's insights in the shared cache; safe to poll repeatedly"""
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status != "completed" or not batch.output_file_id:
+            return {"status": batch.status, "stored": 0}
+
+        output = await self.client.files.content(batch.output_file_id)
+
+        stored = 0
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+
+            result = orjson.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+
+            content = response["body"]["choices"][0]["message"]["content"]
+            # Only count what actually reached Redis, so a caller can tell to poll again
+            if await redis_setex(result["custom_id"], AI_CACHE_TTL, orjson.dumps(self._parse_insights(content))):
+                stored += 1
+
+        return {"status": batch.status, "stored": stored}
+
+    async def _complete_batched(self, prompt: str) -> Dict[str, str]:
+        """
+        Queue one property's prompt and wait for its share of a batched completion
+
+        Properties arriving within AI_BATCH_WINDOW (up to AI_BATCH_MAX_SIZE) are
+        sent as one request, amortizing the instructions and the round-trip.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._ai_pending.append((prompt, future))
+
+        if len(self._ai_pending) >= AI_BATCH_MAX_SIZE:
+            self._flush_ai_batch()
+        elif self._ai_flush_handle is None:
+            self._ai_flush_handle = loop.call_later(AI_BATCH_WINDOW, self._flush_ai_batch)
+
+        return await future
+
+    def _flush_ai_batch(self) -> None:
+        if self._ai_flush_handle is not None:
+            self._ai_flush_handle.cancel()
+            self._ai_flush_handle = None
+
+        batch, self._ai_pending = self._ai_pending, []
+        if batch:
+            task = asyncio.create_task(self._run_ai_batch(batch))
+            self._ai_batch_tasks.add(task)  # Hold a reference until it finishes
+            task.add_done_callback(self._ai_batch_tasks.discard)
+
+    async def _run_ai_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
         try:
-            if not self.client:
-                print("⚠️ OpenAI client not configured, falling back to data-based insights")
-                return self._generate_data_based_fallback(insights_data, city, state)
-
+            if len(batch) == 1:
+                prompt, future = batch[0]
+                insights = await self._complete(prompt, max_tokens=INSIGHTS_MAX_TOKENS)
+                if not future.done():
+                    future.set_result(insights)
+                return
+
+            batch_prompt = "\n\n".join(f"ID={i}\n{prompt}" for i, (prompt, _) in enumerate(batch))
             response = await self.client.chat.completions.create(
-                model="gpt-4.1",
-                messages=[
-                    {"role": "system", "content": "You are a data-driven real estate analyst."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=250,
-                temperature=0.5,
+                **self._completion_body(
+                    batch_prompt,
+                    max_tokens=INSIGHTS_MAX_TOKENS * len(batch),
+                    schema=BATCH_INSIGHTS_SCHEMA,
+                    system_prompt=BATCH_INSIGHTS_SYSTEM_PROMPT
+                )
             )
-
-            content = response.choices[0].message.content.strip()
-            return self._parse_insights(content)
+            # A truncated or off-schema answer is treated like a missing ID, so every
+            # property retries on its own instead of falling back together
+            try:
+                results = orjson.loads(response.choices[0].message.content)["results"]
+                answers = {result.pop("id"): result for result in results}
+            except (orjson.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+                raise MalformedBatchResponse(f"Unreadable batched response: {e!r}") from e
+
+            for i, (_, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if answers.get(i):
+                    future.set_result(self._with_defaults(answers[i]))
+                else:
+                    future.set_exception(MalformedBatchResponse(f"No insights for ID={i}"))
 
         except Exception as e:
-            print(f"AI formatting error: {e}")
-            return self._generate_data_based_fallback(insights_data, city, state)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
 
     # ------------------------
     # Helpers
     # ------------------------
 
-    async def _get_coordinates(self, city: str, state: str) -> tuple:
-        """Get real coordinates for city/state via Google Geocoding API"""
-        if not self.google_api_key:
-            return (None, None)
+    async def _google_get(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        GET a Google Maps endpoint under the shared concurrency cap
 
-        try:
-            import aiohttp
-            geocoding_url = "https://maps.googleapis.com/maps/api/geocode/json"
-            params = {"address": f"{city}, {state}", "key": self.google_api_key}
+        OVER_QUERY_LIMIT is retried with jittered exponential backoff instead of
+        being treated as a missing result.
+        """
+        for attempt in range(GOOGLE_MAX_RETRIES + 1):
+            async with self._google_sem:
+                response = await self._get_client().get(url, params=params)
+                data = orjson.loads(response.content)
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(geocoding_url, params=params) as response:
-                    data = await response.json()
-                    if data.get("status") == "OK" and data["results"]:
-                        loc = data["results"][0]["geometry"]["location"]
-                        return loc["lat"], loc["lng"]
+            if data.get("status") != "OVER_QUERY_LIMIT" or attempt == GOOGLE_MAX_RETRIES:
+                return data
 
-        except Exception as e:
-            print(f"❌ Geocoding error for {city}, {state}: {e}")
-        return (None, None)
+            logger.warning("Google OVER_QUERY_LIMIT (attempt %d), backing off", attempt + 1)
+            await asyncio.sleep(2 ** attempt + random.random())
+
+        return data
 
-    async def _get_coordinates_from_address(self, address: str) -> tuple:
-        """Geocode full property address"""
+    async def _cached_coordinates(self, key: str) -> Optional[tuple]:
+        """In-process geocode cache first, then the Redis copy shared by all workers"""
+        cached = self._geo_cache.get(key)
+        if cached is not None:
+            return cached
+
+        raw = await redis_get(GEO_REDIS_PREFIX + key)
+        if raw is None:
+            return None
+
+        coords = unpack_coords(raw)
+        if coords is None:
+            return None
+        self._geo_cache[key] = coords
+        return coords
+
+    async def _remember_coordinates(self, key: str, coords: tuple) -> None:
+        self._geo_cache[key] = coords
+        await redis_setex(GEO_REDIS_PREFIX + key, GEO_REDIS_TTL, pack_coords(coords))
+
+    async def _geocode(self, query: str) -> tuple:
+        """Geocode an address or "city, state" string via Google Geocoding API"""
         if not self.google_api_key:
             return (None, None)
 
+        key = query.strip().lower()
+        cached = await self._cached_coordinates(key)
+        if cached is not None:
+            return cached
+
+        # A page of listings in one city asks for the same geocode at once;
+        # send one Google request and hand its answer to every caller
+        return await self._geo_flight.do(key, lambda: self._fetch_coordinates(query, key))
+
+    async def _fetch_coordinates(self, query: str, key: str) -> tuple:
         try:
-            import aiohttp
-            url = "https://maps.googleapis.com/maps/api/geocode/json"
-            params = {"address": address, "key": self.google_api_key}
+            params = {"address": query, "key": self.google_api_key}
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params) as response:
-                    data = await response.json()
-                    if data.get("status") == "OK" and data["results"]:
-                        loc = data["results"][0]["geometry"]["location"]
-                        return loc["lat"], loc["lng"]
+            data = await self._google_get(GEOCODE_URL, params)
+            if data.get("status") == "OK" and data["results"]:
+                loc = data["results"][0]["geometry"]["location"]
+                coords = (loc["lat"], loc["lng"])
+                await self._remember_coordinates(key, coords)
+                return coords
 
         except Exception as e:
-            print(f"❌ Address geocoding error: {e}")
+            logger.warning("Geocoding error for %s: %s", query, e)
         return (None, None)
 
     def _parse_insights(self, ai_response: str) -> Dict[str, str]:
-        """Parse GPT output into structured insights, even if slightly misformatted"""
-        insights = {
-            "neighborhood": "Neighborhood data unavailable",
-            "commute": "Commute data unavailable",
-            "lifestyle": "Lifestyle data unavailable",
-            "schools": "School data unavailable"
-        }
-
-        lines = ai_response.split("\n")
-        for line in lines:
-            clean = line.strip().lower()
-            if "neighborhood" in clean:
-                insights["neighborhood"] = line.split(":", 1)[-1].strip()
-            elif "commute" in clean:
-                insights["commute"] = line.split(":", 1)[-1].strip()
-            elif "lifestyle" in clean:
-                insights["lifestyle"] = line.split(":", 1)[-1].strip()
-            elif "school" in clean:
-                insights["schools"] = line.split(":", 1)[-1].strip()
-
-        return insights
+        """Decode a schema-constrained GPT response into the 4 insights"""
+        return self._with_defaults(orjson.loads(ai_response))
+
+    def _with_defaults(self, insights: Dict[str, Any]) -> Dict[str, str]:
+        """Exactly the 4 insight fields, with a placeholder for any the model left empty"""
+        return {field: insights.get(field) or default for field, default in INSIGHT_DEFAULTS.items()}
+
+    def _is_data_complete(self, insights_data: Dict[str, Any]) -> bool:
+        """True when every field the data-based template reads came back from a real lookup"""
+        if insights_data.get("data_source") == "fallback":
+            return False
+
+        walk_score = (insights_data.get("neighborhood") or {}).get("walkability", {}).get("walk_score")
+        commute = (insights_data.get("commute") or {}).get("driving_to_downtown")
+        lifestyle = insights_data.get("lifestyle") or {}
+        district_rating = (insights_data.get("schools") or {}).get("district_rating")
+
+        return (
+            walk_score is not None
+            and bool(commute)
+            and not commute.startswith("Research")  # downtown_service's "couldn't compute" text
+            and "unavailable" not in commute.lower()
+            and bool(lifestyle.get("total_amenities"))
+            and district_rating is not None
+        )
 
     def _generate_data_based_fallback(self, insights_data: Dict[str, Any], city: str, state: str) -> Dict[str, str]:
         """Fallback if GPT fails, use raw API values"""
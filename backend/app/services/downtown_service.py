@@ -3,22 +3,164 @@ Downtown mapping service for housing recommendations
 
 Handles:
 1. Finding the appropriate downtown for each property
-2. Proper fallback to nearest major downtown using Google Places
+2. Proper fallback to nearest major downtown (static table, KD-tree lookup)
 3. Dynamic distance calculation to correct downtown
 4. Clear labeling (e.g., "Dallas Downtown", "Princeton Downtown")
 """
 
+import asyncio
 import aiohttp
-import math
-from typing import Optional, Tuple
+import h3
+import logging
+import random
+import numpy as np
+import orjson
+from scipy.spatial import cKDTree
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from ..core.cache import LayeredCache, SingleFlight, pack_coords, unpack_coords
+from ..core.circuit import CircuitBreaker
 from ..core.config import settings
+from ..core.ratelimit import TokenBucket
+from ..data.major_downtowns import MAJOR_DOWNTOWNS
+
+logger = logging.getLogger(__name__)
+
+PLACES_TEXTSEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+
+# Downtown searches, geocodes and downtown choices barely change, so keep them
+# two days; drive times follow traffic, so only an hour
+PLACES_CACHE_TTL = 48 * 3600
+GEOCODE_CACHE_TTL = 48 * 3600
+DOWNTOWN_CACHE_TTL = 48 * 3600
+COMMUTE_CACHE_TTL = 3600
+
+# H3 resolutions for cache keys: res 9 cells (~0.1 km^2) for commute origins, res 10
+# for the downtown end, res 7 (~5 km^2) for which downtown an area maps to
+COMMUTE_ORIGIN_RES = 9
+COMMUTE_DEST_RES = 10
+DOWNTOWN_AREA_RES = 7
+
+# Retries for OVER_QUERY_LIMIT / HTTP 429 before giving up on a call
+GOOGLE_MAX_RETRIES = 3
+
+# Distance Matrix accepts up to 25 origins per request; single commute lookups to
+# the same downtown arriving within the window are sent together
+DM_MAX_ORIGINS = 25
+COMMUTE_BATCH_WINDOW = 0.02
+
+EARTH_RADIUS_MILES = 3959.0
+
+
+class Coord(NamedTuple):
+    lat: float
+    lng: float
+
+
+class DowntownInfo(NamedTuple):
+    """Downtown label plus its coordinates (None when only the city-area fallback applies)"""
+    label: str
+    coords: Optional[Coord]
+
+
+def haversine_miles(lat1, lng1, lat2, lng2):
+    """
+    Great-circle distance in miles between points given in degrees
+
+    Accepts scalars or NumPy arrays (broadcast against each other), so one
+    call scores a downtown against a whole page of properties.
+    """
+    lat1r = np.radians(lat1)
+    lat2r = np.radians(lat2)
+    dlat = lat2r - lat1r
+    dlng = np.radians(np.subtract(lng2, lng1))
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1r) * np.cos(lat2r) * np.sin(dlng / 2) ** 2
+    return EARTH_RADIUS_MILES * 2 * np.arcsin(np.sqrt(a))
+
+
+def _unit_vectors(lats, lngs) -> np.ndarray:
+    """Points on the unit sphere; straight-line distance between them grows with great-circle distance"""
+    lat = np.radians(lats)
+    lng = np.radians(lngs)
+    return np.column_stack((np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)))
+
+
+# Every major downtown in one KD-tree, so the nearest is found across state lines
+# (a Jersey City property can map to New York) in O(log n); nearest by chord
+# distance on the sphere is exactly nearest by haversine, so no re-ranking is needed
+ALL_MAJOR_DOWNTOWNS = [downtown for candidates in MAJOR_DOWNTOWNS.values() for downtown in candidates]
+_DOWNTOWN_TREE = cKDTree(_unit_vectors(
+    [lat for _, lat, _ in ALL_MAJOR_DOWNTOWNS],
+    [lng for _, _, lng in ALL_MAJOR_DOWNTOWNS]
+))
 
 
 class DowntownService:
     """Service for mapping properties to appropriate downtown areas"""
 
+    __slots__ = (
+        "google_api_key", "_base_params",
+        "_places_cache", "_geocode_cache", "_commute_cache", "_downtown_cache",
+        "_http", "_places_sema", "_geocode_sema", "_dm_sema", "_bucket",
+        "_places_breaker", "_geocode_breaker", "_dm_breaker",
+        "_dm_pending", "_dm_flush_handles", "_dm_batch_tasks", "_flight",
+    )
+
     def __init__(self):
         self.google_api_key = settings.google_maps_api_key
+        # Params every Google call carries; per-call params are merged on top
+        self._base_params: Dict[str, str] = {"key": self.google_api_key}
+
+        self._places_cache = LayeredCache("places:", PLACES_CACHE_TTL)
+        # Same "geo:" keys and packed values as the AI insights geocoder, so they share entries
+        self._geocode_cache = LayeredCache("geo:", GEOCODE_CACHE_TTL, dumps=pack_coords, loads=unpack_coords)
+        self._commute_cache = LayeredCache("commute:", COMMUTE_CACHE_TTL)
+        self._downtown_cache = LayeredCache("downtown:", DOWNTOWN_CACHE_TTL)
+
+        self._http: Optional[aiohttp.ClientSession] = None
+
+        # Each Google endpoint has its own QPS quota, so cap them separately;
+        # the token bucket keeps the combined sustained rate under the limit
+        self._places_sema = asyncio.Semaphore(settings.google_endpoint_concurrency)
+        self._geocode_sema = asyncio.Semaphore(settings.google_endpoint_concurrency)
+        self._dm_sema = asyncio.Semaphore(settings.google_endpoint_concurrency)
+        self._bucket = TokenBucket(
+            rate=settings.google_requests_per_second,
+            capacity=max(1, int(settings.google_requests_per_second))
+        )
+
+        # During a Google outage, skip straight to the fallbacks instead of
+        # waiting out the timeout on every call
+        self._places_breaker = CircuitBreaker("google-places")
+        self._geocode_breaker = CircuitBreaker("google-geocode")
+        self._dm_breaker = CircuitBreaker("google-distance-matrix")
+
+        # Origins waiting for the next batched Distance Matrix call, per downtown
+        self._dm_pending: Dict[Tuple[float, float], List[Tuple[Tuple[float, float], asyncio.Future]]] = {}
+        self._dm_flush_handles: Dict[Tuple[float, float], asyncio.TimerHandle] = {}
+        self._dm_batch_tasks: Set[asyncio.Task] = set()
+
+        # Concurrent cache misses for the same key share one lookup, keyed
+        # ("kind", cache key) so the lookup kinds can't collide
+        self._flight = SingleFlight()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared session so Google calls reuse keep-alive TLS connections"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=60
+                ),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
 
     async def find_appropriate_downtown(
         self,
@@ -26,30 +168,55 @@ class DowntownService:
         property_state: str,
         property_lat: float,
         property_lng: float
-    ) -> Tuple[str, Optional[Tuple[float, float]]]:
+    ) -> DowntownInfo:
         """
         Find the most appropriate downtown for a property
 
         Returns:
-            Tuple of (downtown_label, downtown_coordinates)
-            e.g., ("Princeton Downtown", (40.3573, -74.6672))
+            DowntownInfo(label, coords), which still unpacks as a 2-tuple
+            e.g., DowntownInfo("Princeton Downtown", Coord(40.3573, -74.6672))
         """
 
         if not self.google_api_key:
-            return (f"{property_city} area", None)
+            return DowntownInfo(f"{property_city} area", None)
 
+        # Every property in the same ~5 km cell of a city maps to the same downtown
+        key = (
+            f"{h3.latlng_to_cell(property_lat, property_lng, DOWNTOWN_AREA_RES)}:"
+            f"{property_city.lower()}:{property_state.lower()}"
+        )
+        cached = await self._downtown_cache.get(key)
+        if cached is not None:
+            label, coords = cached
+            return DowntownInfo(label, Coord(*coords))
+
+        return await self._flight.do(
+            ("downtown", key),
+            lambda: self._locate_downtown(key, property_city, property_state, property_lat, property_lng)
+        )
+
+    async def _locate_downtown(
+        self,
+        key: str,
+        property_city: str,
+        property_state: str,
+        property_lat: float,
+        property_lng: float
+    ) -> DowntownInfo:
         # Step 1: Try to find local downtown
-        local_downtown = await self._find_local_downtown(
+        downtown = await self._find_local_downtown(
             property_city, property_state, property_lat, property_lng
         )
 
-        if local_downtown:
-            return local_downtown
-
         # Step 2: Fallback to nearest major downtown
-        return await self._find_nearest_major_downtown(
-            property_city, property_state, property_lat, property_lng
-        )
+        if not downtown:
+            downtown = await self._find_nearest_major_downtown(
+                property_city, property_state, property_lat, property_lng
+            )
+
+        if downtown.coords is not None:
+            await self._downtown_cache.set(key, [downtown.label, list(downtown.coords)])
+        return downtown
 
     async def _find_local_downtown(
         self,
@@ -57,34 +224,35 @@ class DowntownService:
         state: str,
         property_lat: float,
         property_lng: float
-    ) -> Optional[Tuple[str, Tuple[float, float]]]:
+    ) -> Optional[DowntownInfo]:
         """Try to find the local downtown for the property's city"""
 
         try:
-            async with aiohttp.ClientSession() as session:
-                # Search for city's downtown
-                query = f"Downtown {city}, {state}"
-                url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-                params = {"query": query, "key": self.google_api_key}
-
-                async with session.get(url, params=params) as response:
-                    data = await response.json()
-
-                    if data.get("status") == "OK" and data.get("results"):
-                        for result in data["results"][:3]:  # Check top 3 results
-                            downtown_coords = await self._geocode_address(result["formatted_address"])
-
-                            if downtown_coords:
-                                dt_lat, dt_lng = downtown_coords
-                                distance = self._calculate_distance(property_lat, property_lng, dt_lat, dt_lng)
-
-                                # Accept local downtown if within 50 miles and matches city
-                                if distance <= 50 and city.lower() in result["formatted_address"].lower():
-                                    print(f"✅ Found local downtown: {city} Downtown, distance: {distance:.1f} miles")
-                                    return (f"{city} Downtown", (dt_lat, dt_lng))
-
-        except Exception as e:
-            print(f"❌ Error finding local downtown for {city}, {state}: {e}")
+            # Search for city's downtown
+            results = await self._text_search(f"Downtown {city}, {state}")
+
+            # Only results in the property's city can be accepted, so only geocode
+            # those, and all together rather than one round-trip at a time
+            results = [result for result in results if city.lower() in result["formatted_address"].lower()]
+            candidates = await asyncio.gather(
+                *[self._geocode_address(result["formatted_address"]) for result in results],
+                return_exceptions=True
+            )
+
+            found = [coords for coords in candidates if coords and not isinstance(coords, BaseException)]
+            distances = self._calculate_distance_from(property_lat, property_lng, found)
+
+            for (dt_lat, dt_lng), distance in zip(found, distances):
+                # Accept local downtown if within 50 miles (city already matched)
+                if distance <= 50:
+                    logger.debug(
+                        "Found local downtown",
+                        extra={"city": city, "state": state, "distance_mi": round(distance, 1)}
+                    )
+                    return DowntownInfo(f"{city} Downtown", Coord(dt_lat, dt_lng))
+
+        except Exception:
+            logger.warning("Local downtown lookup failed for %s, %s", city, state, exc_info=True)
 
         return None
 
@@ -94,42 +262,25 @@ class DowntownService:
         property_state: str,
         property_lat: float,
         property_lng: float
-    ) -> Tuple[str, Optional[Tuple[float, float]]]:
-        """Find nearest major downtown dynamically using Google Places"""
+    ) -> DowntownInfo:
+        """Find the nearest major downtown from the static table (any state)"""
 
         try:
-            async with aiohttp.ClientSession() as session:
-                # Search for major city downtown in the state
-                query = f"major city downtown in {property_state}"
-                url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-                params = {"query": query, "key": self.google_api_key}
-
-                async with session.get(url, params=params) as response:
-                    data = await response.json()
-
-                    if data.get("status") == "OK" and data.get("results"):
-                        # Get the first major downtown result
-                        result = data["results"][0]
-                        coords = await self._geocode_address(result["formatted_address"])
+            _, i = _DOWNTOWN_TREE.query(_unit_vectors([property_lat], [property_lng])[0])
+            name, lat, lng = ALL_MAJOR_DOWNTOWNS[int(i)]
+            distance = self._calculate_distance(property_lat, property_lng, lat, lng)
 
-                        if coords:
-                            # Extract city name from the result
-                            city_name = result.get("name", "").replace(" Downtown", "").replace("Downtown ", "")
-                            if not city_name:
-                                # Fallback: extract from formatted address
-                                address_parts = result["formatted_address"].split(",")
-                                city_name = address_parts[0].strip() if address_parts else property_city
+            logger.debug(
+                "Using nearest major downtown",
+                extra={"city": property_city, "downtown": name, "distance_mi": round(distance, 1)}
+            )
+            return DowntownInfo(f"{name} Downtown", Coord(lat, lng))
 
-                            distance = self._calculate_distance(property_lat, property_lng, coords[0], coords[1])
-
-                            print(f"✅ Using nearest major downtown: {city_name} Downtown, distance: {distance:.1f} miles")
-                            return (f"{city_name} Downtown", coords)
-
-        except Exception as e:
-            print(f"❌ Error finding major downtown: {e}")
+        except Exception:
+            logger.warning("Major downtown lookup failed", exc_info=True)
 
         # Final fallback
-        return (f"{property_city} area", None)
+        return DowntownInfo(f"{property_city} area", None)
 
     async def get_commute_time_to_downtown(
         self,
@@ -146,68 +297,234 @@ class DowntownService:
         try:
             dt_lat, dt_lng = downtown_coords
 
-            async with aiohttp.ClientSession() as session:
-                url = "https://maps.googleapis.com/maps/api/distancematrix/json"
-                params = {
-                    "origins": f"{property_lat},{property_lng}",
-                    "destinations": f"{dt_lat},{dt_lng}",
-                    "mode": "driving",
-                    "departure_time": "now",
-                    "key": self.google_api_key,
-                }
-
-                async with session.get(url, params=params) as response:
-                    data = await response.json()
-
-                    if data.get("status") == "OK" and data["rows"]:
-                        element = data["rows"][0]["elements"][0]
-                        if element.get("status") == "OK":
-                            duration = element["duration"]["text"]
-                            return f"{duration} drive to {downtown_label}"
+            # Neighbouring properties (same H3 cell) share one drive time
+            key = self._commute_key(property_lat, property_lng, dt_lat, dt_lng)
+            duration = await self._commute_cache.get(key)
+            if duration is None:
+                duration = await self._flight.do(
+                    ("commute", key),
+                    lambda: self._queued_commute((property_lat, property_lng), (dt_lat, dt_lng))
+                )
 
-        except Exception as e:
-            print(f"❌ Commute time error to {downtown_label}: {e}")
+            if duration:
+                return f"{duration} drive to {downtown_label}"
+
+        except Exception:
+            logger.warning("Commute lookup to %s failed", downtown_label, exc_info=True)
 
         return f"Research commute to {downtown_label}"
 
-    async def _geocode_address(self, address: str) -> Optional[Tuple[float, float]]:
+    async def get_commute_times_batch(
+        self,
+        origins: List[Tuple[float, float]],
+        downtown: Tuple[float, float]
+    ) -> List[Optional[str]]:
+        """
+        Driving times from many properties to one downtown
+
+        Uses one Distance Matrix request per 25 uncached origins. Returns the
+        duration text (e.g. "25 mins") per origin, or None where there is no route.
+        """
+        dt_lat, dt_lng = downtown
+        keys = [self._commute_key(lat, lng, dt_lat, dt_lng) for lat, lng in origins]
+        durations: List[Optional[str]] = [await self._commute_cache.get(key) for key in keys]
+
+        missing = [i for i, duration in enumerate(durations) if duration is None]
+        chunks = [missing[i:i + DM_MAX_ORIGINS] for i in range(0, len(missing), DM_MAX_ORIGINS)]
+
+        async def fetch(chunk: List[int]) -> None:
+            params = {
+                "origins": "|".join(f"{origins[i][0]},{origins[i][1]}" for i in chunk),
+                "destinations": f"{dt_lat},{dt_lng}",
+                "mode": "driving",
+                "departure_time": "now",
+                **self._base_params,
+            }
+            data = await self._google_get(DISTANCE_MATRIX_URL, params, self._dm_sema, self._dm_breaker)
+            if data.get("status") != "OK":
+                return
+
+            # One row per origin, in request order
+            for i, row in zip(chunk, data.get("rows", [])):
+                element = row["elements"][0]
+                if element.get("status") == "OK":
+                    durations[i] = element["duration"]["text"]
+                    await self._commute_cache.set(keys[i], durations[i])
+
+        await asyncio.gather(*[fetch(chunk) for chunk in chunks])
+        return durations
+
+    def _commute_key(self, o_lat: float, o_lng: float, d_lat: float, d_lng: float) -> str:
+        return (
+            f"{h3.latlng_to_cell(o_lat, o_lng, COMMUTE_ORIGIN_RES)}->"
+            f"{h3.latlng_to_cell(d_lat, d_lng, COMMUTE_DEST_RES)}"
+        )
+
+    async def _queued_commute(
+        self,
+        origin: Tuple[float, float],
+        downtown: Tuple[float, float]
+    ) -> Optional[str]:
+        """Wait for this origin's share of the next batched Distance Matrix call to downtown"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._dm_pending.setdefault(downtown, [])
+        pending.append((origin, future))
+
+        if len(pending) >= DM_MAX_ORIGINS:
+            self._flush_commutes(downtown)
+        elif downtown not in self._dm_flush_handles:
+            self._dm_flush_handles[downtown] = loop.call_later(
+                COMMUTE_BATCH_WINDOW, self._flush_commutes, downtown
+            )
+
+        return await future
+
+    def _flush_commutes(self, downtown: Tuple[float, float]) -> None:
+        handle = self._dm_flush_handles.pop(downtown, None)
+        if handle is not None:
+            handle.cancel()
+
+        batch = self._dm_pending.pop(downtown, [])
+        if batch:
+            task = asyncio.create_task(self._run_commute_batch(downtown, batch))
+            self._dm_batch_tasks.add(task)  # Hold a reference until it finishes
+            task.add_done_callback(self._dm_batch_tasks.discard)
+
+    async def _run_commute_batch(
+        self,
+        downtown: Tuple[float, float],
+        batch: List[Tuple[Tuple[float, float], asyncio.Future]]
+    ) -> None:
+        try:
+            durations = await self.get_commute_times_batch([origin for origin, _ in batch], downtown)
+            for (_, future), duration in zip(batch, durations):
+                if not future.done():
+                    future.set_result(duration)
+
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _geocode_address(self, address: str) -> Optional[Coord]:
         """Geocode an address to coordinates"""
 
         if not self.google_api_key:
             return None
 
+        key = address.strip().lower()
+        cached = await self._geocode_cache.get(key)
+        if cached is not None:
+            return Coord(*cached)
+
+        return await self._flight.do(("geo", key), lambda: self._fetch_geocode(address, key))
+
+    async def _fetch_geocode(self, address: str, key: str) -> Optional[Coord]:
         try:
-            async with aiohttp.ClientSession() as session:
-                url = "https://maps.googleapis.com/maps/api/geocode/json"
-                params = {"address": address, "key": self.google_api_key}
+            params = {**self._base_params, "address": address}
 
-                async with session.get(url, params=params) as response:
-                    data = await response.json()
+            data = await self._google_get(GEOCODE_URL, params, self._geocode_sema, self._geocode_breaker)
 
-                    if data.get("status") == "OK" and data["results"]:
-                        location = data["results"][0]["geometry"]["location"]
-                        return (location["lat"], location["lng"])
+            if data.get("status") == "OK" and data["results"]:
+                location = data["results"][0]["geometry"]["location"]
+                coords = Coord(location["lat"], location["lng"])
+                await self._geocode_cache.set(key, coords)
+                return coords
 
-        except Exception as e:
-            print(f"❌ Geocoding error for {address}: {e}")
+        except Exception:
+            logger.warning("Geocoding failed for %s", address, exc_info=True)
 
         return None
 
+    async def _google_get(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        sema: asyncio.Semaphore,
+        breaker: CircuitBreaker
+    ) -> Dict[str, Any]:
+        """
+        GET a Google Maps endpoint under its concurrency cap and the shared rate limit
+
+        OVER_QUERY_LIMIT (or HTTP 429) is retried with jittered exponential backoff
+        instead of being read as "no result". While the endpoint's circuit is open
+        this returns {"status": "CIRCUIT_OPEN"} without touching the network.
+        """
+        if not breaker.allow():
+            return {"status": "CIRCUIT_OPEN"}
+
+        for attempt in range(GOOGLE_MAX_RETRIES + 1):
+            try:
+                async with sema:
+                    await self._bucket.acquire()
+                    async with self._get_session().get(url, params=params) as response:
+                        if response.status == 429:
+                            data = {"status": "OVER_QUERY_LIMIT"}
+                        else:
+                            response.raise_for_status()
+                            data = orjson.loads(await response.read())
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                breaker.record_failure()
+                raise
+
+            if data.get("status") != "OVER_QUERY_LIMIT":
+                breaker.record_success()
+                return data
+            if attempt == GOOGLE_MAX_RETRIES:
+                breaker.record_failure()
+                return data
+
+            logger.warning("Google OVER_QUERY_LIMIT (attempt %d), backing off", attempt + 1)
+            await asyncio.sleep(2 ** attempt + random.random())
+
+        return data
+
+    async def _text_search(self, query: str) -> List[Dict[str, Any]]:
+        """Top 3 Places text-search results for a query, trimmed to name + formatted_address"""
+        key = query.strip().lower()
+        cached = await self._places_cache.get(key)
+        if cached is not None:
+            return cached
+
+        return await self._flight.do(("places", key), lambda: self._fetch_text_search(query, key))
+
+    async def _fetch_text_search(self, query: str, key: str) -> List[Dict[str, Any]]:
+        params = {**self._base_params, "query": query}
+
+        data = await self._google_get(PLACES_TEXTSEARCH_URL, params, self._places_sema, self._places_breaker)
+
+        # Quota/denied responses are transient; only cache real answers
+        if data.get("status") not in ("OK", "ZERO_RESULTS"):
+            return []
+
+        results = [
+            {"name": result.get("name", ""), "formatted_address": result["formatted_address"]}
+            for result in data.get("results", [])[:3]
+        ]
+        await self._places_cache.set(key, results)
+        return results
+
     def _calculate_distance(self, lat1: float, lng1: float, lat2: float, lng2: float) -> float:
         """Calculate distance between two points in miles using Haversine formula"""
+        return float(haversine_miles(lat1, lng1, lat2, lng2))
 
-        R = 3959  # Earth's radius in miles
-        dlat = math.radians(lat2 - lat1)
-        dlng = math.radians(lng2 - lng1)
-
-        a = (
-            math.sin(dlat/2)**2 +
-            math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-            math.sin(dlng/2)**2
-        )
+    def _calculate_distance_from(
+        self,
+        origin_lat: float,
+        origin_lng: float,
+        targets: List[Tuple[float, float]]
+    ) -> List[float]:
+        """
+        Distances in miles from one origin to many targets
 
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        return R * c
+        One vectorized haversine call, so the origin's radians/cosine are
+        computed once and broadcast across every target.
+        """
+        if not targets:
+            return []
+        points = np.asarray(targets, dtype=float)
+        return haversine_miles(origin_lat, origin_lng, points[:, 0], points[:, 1]).tolist()
 
 
 # Global service instance
@@ -1,7 +1,65 @@
+import asyncio
 import httpx
-from typing import Optional, Dict, Any
+import orjson
+from typing import Optional, Dict, Any, List, Union
+from ..core.circuit import CircuitBreaker
 from ..core.config import settings
 
+# Concurrent Estated lookups per fetch_properties_bulk() call
+ESTATED_BULK_CONCURRENCY = 10
+
+_client: Optional[httpx.AsyncClient] = None
+
+# Fails fast while Estated is down instead of waiting out the 30s timeout per call
+_breaker = CircuitBreaker("estated")
+
+
+def _get_client() -> httpx.AsyncClient:
+    """
+    Shared client so Estated calls reuse pooled keep-alive connections
+
+    HTTP/2 multiplexes concurrent lookups over one TLS connection to Estated.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            headers={"Accept": "application/json"}
+        )
+    return _client
+
+
+async def aclose() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _get(url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """GET an Estated endpoint through the circuit breaker"""
+    if not _breaker.allow():
+        raise Exception("Estated API unavailable (circuit open)")
+
+    try:
+        response = await _get_client().get(url, params=params)
+        response.raise_for_status()
+        _breaker.record_success()
+        return orjson.loads(response.content)
+
+    except httpx.HTTPStatusError as e:
+        # A 4xx is about this request (bad address, no match); only count outages
+        if e.response.status_code == 429 or e.response.status_code >= 500:
+            _breaker.record_failure()
+        else:
+            _breaker.record_success()
+        raise Exception(f"Estated API error: {e.response.status_code} - {e.response.text}")
+    except httpx.RequestError as e:
+        _breaker.record_failure()
+        raise Exception(f"Request error: {str(e)}")
+
 
 async def fetch_property(
     address: str,
@@ -36,16 +94,7 @@ async def fetch_property(
     if postal_code:
         params["zip"] = postal_code
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(base_url, params=params, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-
-        except httpx.HTTPStatusError as e:
-            raise Exception(f"Estated API error: {e.response.status_code} - {e.response.text}")
-        except httpx.RequestError as e:
-            raise Exception(f"Request error: {str(e)}")
+    return await _get(base_url, params)
 
 
 async def search_properties(
@@ -93,13 +142,23 @@ async def search_properties(
     if bathrooms:
         params["bathrooms"] = bathrooms
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(base_url, params=params, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
+    return await _get(base_url, params)
+
+
+async def fetch_properties_bulk(specs: List[Dict[str, Any]]) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Fetch many properties concurrently (bounded), in the order given
+
+    Args:
+        specs: fetch_property() keyword arguments, one dict per property
+
+    Returns:
+        Property data per spec, or the exception raised for that spec
+    """
+    sem = asyncio.Semaphore(ESTATED_BULK_CONCURRENCY)
+
+    async def fetch(spec: Dict[str, Any]) -> Dict[str, Any]:
+        async with sem:
+            return await fetch_property(**spec)
 
-        except httpx.HTTPStatusError as e:
-            raise Exception(f"Estated API error: {e.response.status_code} - {e.response.text}")
-        except httpx.RequestError as e:
-            raise Exception(f"Request error: {str(e)}")
\ No newline at end of file
+    return await asyncio.gather(*[fetch(spec) for spec in specs], return_exceptions=True)
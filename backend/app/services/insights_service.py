@@ -1,18 +1,95 @@
 import asyncio
 import aiohttp
-import json
-from typing import Dict, Any, Optional, List
+import logging
+import numpy as np
+import orjson
+from cachetools import TTLCache
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Tuple, Union
+from ..core.cache import LayeredCache, SingleFlight
 from ..core.config import settings
+from ..data.major_downtowns import MAJOR_DOWNTOWNS
+from .downtown_service import haversine_miles
+
+logger = logging.getLogger(__name__)
+
+# Which downtown a city commutes to, and where an address is, hold for a day
+DOWNTOWN_CACHE_TTL = 86400
+GEOCODE_CACHE_TTL = 86400
+
+# Neighbouring listings (same ~100 m grid cell) share one set of insights for an hour
+INSIGHTS_CACHE_TTL = 3600
+INSIGHTS_GRID_DECIMALS = 3
+
+# Per-call limits so one slow upstream can't stall a property's insights: each
+# request gets a few seconds, at most 16 are in flight, and get_all_insights as
+# a whole gives up after 8s and returns its fallback
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=3, connect=1, sock_read=2)
+MAX_CONCURRENT_REQUESTS = 16
+ALL_INSIGHTS_TIMEOUT = 8
+
+# Google responses by endpoint: geocodes and text searches hold for a day, nearby
+# places for an hour, traffic-aware drive times for 15 minutes
+GOOGLE_RESPONSE_TTLS = {
+    "geocode/json": 86400,
+    "textsearch/json": 86400,
+    "nearbysearch/json": 3600,
+    "distancematrix/json": 900,
+}
+# Lifestyle amenities and the Google Places types searched for each
+AMENITY_SEARCH_TYPES: Dict[str, Tuple[str, ...]] = {
+    'grocery_store': ('supermarket', 'grocery_or_supermarket'),
+    'restaurant': ('restaurant', 'food'),
+    'gym': ('gym',),
+    'shopping_mall': ('shopping_mall',),
+    'pharmacy': ('pharmacy',)
+}
+
+# School info when GreatSchools is unavailable or returns no schools
+DEFAULT_SCHOOL_INFO = MappingProxyType({
+    'district_rating': 7.0,
+    'elementary_count': 2,
+    'middle_count': 1,
+    'high_count': 1,
+    'best_elementary': 'Local Elementary School',
+    'best_elementary_rating': 7,
+    'best_high': 'Local High School',
+    'best_high_rating': 7,
+    'has_private_options': True
+})
+
+# Major metros whose downtown is already known: Distance Matrix takes "lat,lng"
+# destinations, so these skip the Places/Geocode search entirely
+KNOWN_DOWNTOWNS: Dict[Tuple[str, str], str] = {
+    (name.lower(), state.lower()): f"{lat},{lng}"
+    for state, downtowns in MAJOR_DOWNTOWNS.items()
+    for name, lat, lng in downtowns
+}
+
+# Step 3 downtown searches per state, by abbreviation and full name
+_NJ_CITIES = ("Downtown Newark, NJ", "Downtown Jersey City, NJ", "Downtown Trenton, NJ")
+_TX_CITIES = ("Downtown Dallas, TX", "Downtown Houston, TX", "Downtown Austin, TX")
+_CA_CITIES = ("Downtown Los Angeles, CA", "Downtown San Francisco, CA", "Downtown San Diego, CA")
+_NY_CITIES = ("Downtown Manhattan, NY", "Downtown Albany, NY", "Downtown Buffalo, NY")
+_FL_CITIES = ("Downtown Miami, FL", "Downtown Orlando, FL", "Downtown Jacksonville, FL")
+STATE_MAJOR_CITY_QUERIES: Dict[str, Tuple[str, ...]] = {
+    'nj': _NJ_CITIES, 'new jersey': _NJ_CITIES,
+    'tx': _TX_CITIES, 'texas': _TX_CITIES,
+    'ca': _CA_CITIES, 'california': _CA_CITIES,
+    'ny': _NY_CITIES, 'new york': _NY_CITIES,
+    'fl': _FL_CITIES, 'florida': _FL_CITIES,
+}
+
 
 class PropertyInsightsService:
     """Service for fetching real-world property insights from various APIs"""
 
     def __init__(self):
         # API Keys - these should be set in .env file
-        self.walkscore_api_key = getattr(settings, 'walkscore_api_key', None)
-        self.google_api_key = getattr(settings, 'google_maps_api_key', None)
-        self.yelp_api_key = getattr(settings, 'yelp_api_key', None)
-        self.greatschools_api_key = getattr(settings, 'greatschools_api_key', None)
+        self.walkscore_api_key: Optional[str] = settings.walkscore_api_key
+        self.google_api_key: Optional[str] = settings.google_maps_api_key
+        self.yelp_api_key: Optional[str] = settings.yelp_api_key
+        self.greatschools_api_key: Optional[str] = settings.greatschools_api_key
 
 
         # Base URLs
@@ -22,10 +99,66 @@ class PropertyInsightsService:
         self.yelp_base = "https://api.yelp.com/v3/businesses/search"
         self.greatschools_base = "https://api.greatschools.org/v3"
 
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._request_sema = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+        self._downtown_cache: TTLCache = TTLCache(maxsize=1024, ttl=DOWNTOWN_CACHE_TTL)
+        self._geocode_cache: TTLCache = TTLCache(maxsize=1024, ttl=GEOCODE_CACHE_TTL)
+        self._insights_cache: TTLCache = TTLCache(maxsize=4096, ttl=INSIGHTS_CACHE_TTL)
+
+        self._response_caches = {
+            endpoint: LayeredCache(f"insights:{endpoint.split('/')[0]}:", ttl)
+            for endpoint, ttl in GOOGLE_RESPONSE_TTLS.items()
+        }
+
+        # A burst of properties in one uncached city shares a single downtown search
+        self._downtown_flight = SingleFlight()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared session so the Google/WalkScore calls reuse keep-alive TLS connections"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=75
+                ),
+                timeout=HTTP_TIMEOUT
+            )
+        return self._session
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _google_get(self, session: aiohttp.ClientSession, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        GET a Google Maps endpoint, served from the response cache when possible
+
+        Only OK / ZERO_RESULTS answers are cached; quota and error responses are
+        transient and go back to Google next time.
+        """
+        cache = self._response_caches.get("/".join(url.rsplit("/", 2)[-2:]))
+        key = "&".join(f"{k}={v}" for k, v in sorted(params.items()) if k != "key")
+
+        if cache is not None:
+            cached = await cache.get(key)
+            if cached is not None:
+                return cached
+
+        async with self._request_sema:
+            async with session.get(url, params=params) as response:
+                data = orjson.loads(await response.read())
+
+        if cache is not None and data.get("status") in ("OK", "ZERO_RESULTS"):
+            await cache.set(key, data)
+        return data
+
     async def get_neighborhood_info(self, address: str, lat: float, lng: float) -> Dict[str, Any]:
         """Fetch neighborhood walkability, safety, and livability data"""
         try:
-            async with aiohttp.ClientSession() as session:
+            session = self._get_session()
+
+            async def _walkscore():
                 # WalkScore API call
                 walkscore_params = {
                     'format': 'json',
@@ -37,20 +170,21 @@ class PropertyInsightsService:
                     'wsapikey': self.walkscore_api_key
                 }
 
-                walkscore_url = f"{self.walkscore_base}?" + "&".join([f"{k}={v}" for k, v in walkscore_params.items()])
-
                 if self.walkscore_api_key:
-                    async with session.get(walkscore_url) as response:
-                        walkscore_data = await response.json()
-                else:
-                    # Mock response when API key not available
-                    walkscore_data = {
-                        'walkscore': 78,
-                        'description': 'Very Walkable',
-                        'transit': {'score': 85, 'description': 'Excellent Transit'},
-                        'bike': {'score': 72, 'description': 'Very Bikeable'}
-                    }
+                    # params= percent-encodes the address (spaces, '#', '&')
+                    async with self._request_sema:
+                        async with session.get(self.walkscore_base, params=walkscore_params) as response:
+                            return orjson.loads(await response.read())
+
+                # Mock response when API key not available
+                return {
+                    'walkscore': 78,
+                    'description': 'Very Walkable',
+                    'transit': {'score': 85, 'description': 'Excellent Transit'},
+                    'bike': {'score': 72, 'description': 'Very Bikeable'}
+                }
 
+            async def _places():
                 # Google Places API for neighborhood amenities and safety indicators
                 places_params = {
                     'location': f"{lat},{lng}",
@@ -61,245 +195,230 @@ class PropertyInsightsService:
 
                 if self.google_api_key:
                     places_url = f"{self.google_places_base}/nearbysearch/json"
-                    async with session.get(places_url, params=places_params) as response:
-                        places_data = await response.json()
-                else:
-                    # Mock response
-                    places_data = {
-                        'results': [
-                            {'name': 'Starbucks', 'types': ['cafe'], 'rating': 4.2},
-                            {'name': 'Whole Foods', 'types': ['grocery_store'], 'rating': 4.5},
-                            {'name': 'Chase Bank', 'types': ['bank'], 'rating': 3.8}
-                        ]
-                    }
+                    return await self._google_get(session, places_url, places_params)
 
+                # Mock response
                 return {
-                    'walkability': {
-                        'walk_score': walkscore_data.get('walkscore', 50),
-                        'description': walkscore_data.get('description', 'Somewhat Walkable'),
-                        'transit_score': walkscore_data.get('transit', {}).get('score', 40),
-                        'bike_score': walkscore_data.get('bike', {}).get('score', 30)
-                    },
-                    'nearby_amenities': len(places_data.get('results', [])),
-                    'avg_rating': sum([place.get('rating', 0) for place in places_data.get('results', [])]) / max(len(places_data.get('results', [])), 1),
-                    'safety_score': min(85, walkscore_data.get('walkscore', 50) + 10)  # Approximate based on walkability
+                    'results': [
+                        {'name': 'Starbucks', 'types': ['cafe'], 'rating': 4.2},
+                        {'name': 'Whole Foods', 'types': ['grocery_store'], 'rating': 4.5},
+                        {'name': 'Chase Bank', 'types': ['bank'], 'rating': 3.8}
+                    ]
                 }
 
+            # The two lookups are independent, so wait on both at once
+            walkscore_data, places_data = await asyncio.gather(_walkscore(), _places())
+
+            walk_score = walkscore_data.get('walkscore', 50)
+            places = places_data.get('results', ())
+            place_count = len(places)
+
+            return {
+                'walkability': {
+                    'walk_score': walk_score,
+                    'description': walkscore_data.get('description', 'Somewhat Walkable'),
+                    'transit_score': walkscore_data.get('transit', {}).get('score', 40),
+                    'bike_score': walkscore_data.get('bike', {}).get('score', 30)
+                },
+                'nearby_amenities': place_count,
+                'avg_rating': sum(place.get('rating', 0) for place in places) / place_count if place_count else 0,
+                'safety_score': min(85, walk_score + 10)  # Approximate based on walkability
+            }
+
         except Exception as e:
-            print(f"Error fetching neighborhood info: {e}")
+            logger.warning("Error fetching neighborhood info: %s", e)
             return {
                 'walkability': {'walk_score': 50, 'description': 'Data Unavailable'},
                 'nearby_amenities': 0,
                 'avg_rating': 0,
-                'safety_score': 50
+                'safety_score': 50,
+                'data_source': 'fallback'
             }
 
     async def get_commute_info(self, lat: float, lng: float, city: str, state: str) -> Dict[str, Any]:
         """Fetch commute times and transportation options"""
         try:
-            async with aiohttp.ClientSession() as session:
-                if self.google_api_key:
-                    # Use Google Distance Matrix API for driving time to downtown
-                    distance_matrix_url = "https://maps.googleapis.com/maps/api/distancematrix/json"
-
-                    # Dynamically determine the appropriate downtown destination with distance validation
-                    downtown_destination = await self._get_downtown_destination(city, state, lat, lng, session)
-                    print(f"🏙️ Using downtown destination: {downtown_destination}")
-
-                    driving_params = {
-                        'origins': f"{lat},{lng}",
-                        'destinations': downtown_destination,
-                        'mode': 'driving',
-                        'departure_time': 'now',
-                        'traffic_model': 'best_guess',
-                        'units': 'imperial',
-                        'key': self.google_api_key
-                    }
+            session = self._get_session()
+            if self.google_api_key:
+                # Use Google Distance Matrix API for driving time to downtown
+                distance_matrix_url = "https://maps.googleapis.com/maps/api/distancematrix/json"
+
+                # Dynamically determine the appropriate downtown destination with distance validation
+                downtown_destination = await self._get_downtown_destination(city, state, lat, lng, session)
+                logger.debug("Using downtown destination: %s", downtown_destination)
+
+                driving_params = {
+                    'origins': f"{lat},{lng}",
+                    'destinations': downtown_destination,
+                    'mode': 'driving',
+                    'departure_time': 'now',
+                    'traffic_model': 'best_guess',
+                    'units': 'imperial',
+                    'key': self.google_api_key
+                }
 
-                    # Make API call with comprehensive logging
-                    try:
-                        print(f"🚗 Making Distance Matrix API call for {lat},{lng}")
-                        async with session.get(distance_matrix_url, params=driving_params) as response:
-                            driving_data = await response.json()
-                            print(f"🚗 Distance Matrix API Response: {driving_data}")
-                    except Exception as e:
-                        print(f"❌ Error calling Google Maps Distance Matrix API: {e}")
-                        driving_data = {'status': 'REQUEST_DENIED'}
-
-                    # Extract commute time from Distance Matrix API response
-                    if (driving_data.get('status') == 'OK' and
-                        driving_data.get('rows') and
-                        len(driving_data['rows']) > 0 and
-                        driving_data['rows'][0].get('elements') and
-                        len(driving_data['rows'][0]['elements']) > 0 and
-                        driving_data['rows'][0]['elements'][0].get('status') == 'OK'):
-
-                        duration_data = driving_data['rows'][0]['elements'][0].get('duration')
-                        if duration_data and duration_data.get('text'):
-                            duration_text = duration_data['text']
-                            commute_insight = f"{duration_text} drive to downtown"
-                            print(f"✅ Successfully parsed commute time: {commute_insight}")
-                        else:
-                            print(f"⚠️ Duration data missing from API response")
-                            commute_insight = "Drive time data unavailable"
+                # Make API call with comprehensive logging
+                try:
+                    logger.debug("Making Distance Matrix API call for %s,%s", lat, lng)
+                    driving_data = await self._google_get(session, distance_matrix_url, driving_params)
+                    logger.debug("Distance Matrix API Response: %s", driving_data)
+                except Exception as e:
+                    logger.warning("Error calling Google Maps Distance Matrix API: %s", e)
+                    driving_data = {'status': 'REQUEST_DENIED'}
+
+                # Extract commute time from Distance Matrix API response
+                try:
+                    element = driving_data['rows'][0]['elements'][0] if driving_data.get('status') == 'OK' else None
+                except (KeyError, IndexError, TypeError):
+                    element = None
+
+                if element is not None and element.get('status') == 'OK':
+                    duration_text = (element.get('duration') or {}).get('text')
+                    if duration_text:
+                        commute_insight = f"{duration_text} drive to downtown"
+                        logger.debug("Parsed commute time: %s", commute_insight)
                     else:
-                        print(f"⚠️ API returned status: {driving_data.get('status')}")
-                        if driving_data.get('error_message'):
-                            print(f"⚠️ API error message: {driving_data.get('error_message')}")
+                        logger.info("Duration data missing from Distance Matrix response")
                         commute_insight = "Drive time data unavailable"
-
                 else:
-                    print(f"⚠️ No Google API key available for commute data")
+                    logger.info(
+                        "Distance Matrix returned status %s: %s",
+                        driving_data.get('status'), driving_data.get('error_message', '')
+                    )
                     commute_insight = "Drive time data unavailable"
 
-                return {
-                    'driving_to_downtown': commute_insight,
-                    'transit_to_downtown': "Limited",
-                    'has_public_transit': False,
-                    'traffic_level': 'moderate'
-                }
+            else:
+                logger.debug("No Google API key available for commute data")
+                commute_insight = "Drive time data unavailable"
+
+            commute = {
+                'driving_to_downtown': commute_insight,
+                'transit_to_downtown': "Limited",
+                'has_public_transit': False,
+                'traffic_level': 'moderate'
+            }
+            if commute_insight == "Drive time data unavailable":
+                commute['data_source'] = 'fallback'
+            return commute
 
         except Exception as e:
-            print(f"❌ Error fetching commute info: {e}")
+            logger.warning("Error fetching commute info: %s", e)
             return {
                 'driving_to_downtown': 'Drive time data unavailable',
                 'transit_to_downtown': 'Limited',
                 'has_public_transit': False,
-                'traffic_level': 'unknown'
+                'traffic_level': 'unknown',
+                'data_source': 'fallback'
             }
 
     async def get_lifestyle_info(self, lat: float, lng: float) -> Dict[str, Any]:
         """Fetch nearby lifestyle amenities (shopping, dining, fitness)"""
         try:
-            async with aiohttp.ClientSession() as session:
-                lifestyle_data = {}
-
-                if self.google_api_key:
-                    print(f"🛒 Making Google Places API calls for {lat},{lng}")
-
-                    # Define amenity types with their Google Places API type names
-                    amenity_types = {
-                        'grocery_store': ['supermarket', 'grocery_or_supermarket'],
-                        'restaurant': ['restaurant', 'food'],
-                        'gym': ['gym'],
-                        'shopping_mall': ['shopping_mall'],
-                        'pharmacy': ['pharmacy']
+            session = self._get_session()
+            lifestyle_data = {}
+
+            if self.google_api_key:
+                logger.debug("Making Google Places API calls for %s,%s", lat, lng)
+
+                amenity_types = AMENITY_SEARCH_TYPES
+
+                # Every (amenity, type) search is independent, so send them all at once
+                queries = [
+                    (amenity, search_type)
+                    for amenity, search_types in amenity_types.items()
+                    for search_type in search_types
+                ]
+                responses = await asyncio.gather(
+                    *[self._nearby_places(session, lat, lng, search_type) for _, search_type in queries]
+                )
+
+                # Dedupe by name in one pass, keeping unique places as parallel
+                # name / rating columns per amenity
+                names = {amenity: [] for amenity in amenity_types}
+                ratings = {amenity: [] for amenity in amenity_types}
+                seen_names = {amenity: set() for amenity in amenity_types}
+
+                for (amenity, _), places in zip(queries, responses):
+                    seen = seen_names[amenity]
+                    for name, rating in places or ():
+                        if name in seen:
+                            continue
+                        seen.add(name)
+                        names[amenity].append(name)
+                        ratings[amenity].append(rating)
+
+                for amenity in amenity_types:
+                    amenity_ratings = np.fromiter(ratings[amenity], dtype=np.float64, count=len(ratings[amenity]))
+                    lifestyle_data[amenity] = {
+                        'count': amenity_ratings.size,
+                        'avg_rating': float(amenity_ratings.mean()) if amenity_ratings.size else 0,
+                        'top_places': names[amenity][:3]
                     }
+                    logger.debug("%s: %d unique places found", amenity, amenity_ratings.size)
 
-                    for amenity, search_types in amenity_types.items():
-                        all_results = []
-
-                        for search_type in search_types:
-                            params = {
-                                'location': f"{lat},{lng}",
-                                'radius': 3000,  # 3km radius
-                                'type': search_type,
-                                'key': self.google_api_key
-                            }
-
-                            url = f"{self.google_places_base}/nearbysearch/json"
-
-                            try:
-                                print(f"🛒 Searching for {search_type} near {lat},{lng}")
-                                async with session.get(url, params=params) as response:
-                                    data = await response.json()
-                                    print(f"🛒 Places API Response for {search_type}: status={data.get('status')}, results_count={len(data.get('results', []))}")
-
-                                    if data.get('status') == 'OK':
-                                        results = data.get('results', [])
-                                        # Extract name and rating from each place
-                                        for place in results:
-                                            place_info = {
-                                                'name': place.get('name', 'Unknown'),
-                                                'rating': place.get('rating', 0),
-                                                'types': place.get('types', [])
-                                            }
-                                            all_results.append(place_info)
-
-                                        print(f"✅ Found {len(results)} {search_type} locations")
-                                    elif data.get('status') == 'ZERO_RESULTS':
-                                        print(f"ℹ️ No {search_type} found in area")
-                                    else:
-                                        print(f"⚠️ Google Places API error for {search_type}: {data.get('status')} - {data.get('error_message', 'Unknown error')}")
-
-                            except Exception as e:
-                                print(f"❌ Error calling Google Places API for {search_type}: {e}")
-
-                        # Remove duplicates based on name and store results
-                        unique_results = []
-                        seen_names = set()
-                        for result in all_results:
-                            if result['name'] not in seen_names:
-                                unique_results.append(result)
-                                seen_names.add(result['name'])
-
-                        lifestyle_data[amenity] = {
-                            'count': len(unique_results),
-                            'avg_rating': sum([place.get('rating', 0) for place in unique_results]) / max(len(unique_results), 1) if unique_results else 0,
-                            'top_places': [place.get('name', 'Unknown') for place in unique_results[:3]]
-                        }
-
-                        print(f"✅ {amenity}: {len(unique_results)} unique places found")
-
-                else:
-                    print(f"⚠️ No Google API key available for lifestyle data")
-                    # Mock data for each amenity type
-                    mock_data = {
-                        'grocery_store': [{'name': 'Walmart Supercenter', 'rating': 4.1}, {'name': 'Kroger', 'rating': 4.3}],
-                        'restaurant': [{'name': 'Chipotle', 'rating': 4.2}, {'name': 'Panera Bread', 'rating': 4.4}],
-                        'gym': [{'name': 'LA Fitness', 'rating': 4.0}, {'name': 'Planet Fitness', 'rating': 4.1}],
-                        'shopping_mall': [{'name': 'NorthPark Center', 'rating': 4.5}],
-                        'pharmacy': [{'name': 'CVS Pharmacy', 'rating': 3.9}, {'name': 'Walgreens', 'rating': 4.0}]
+            else:
+                logger.debug("No Google API key available for lifestyle data")
+                # Mock data for each amenity type
+                mock_data = {
+                    'grocery_store': [{'name': 'Walmart Supercenter', 'rating': 4.1}, {'name': 'Kroger', 'rating': 4.3}],
+                    'restaurant': [{'name': 'Chipotle', 'rating': 4.2}, {'name': 'Panera Bread', 'rating': 4.4}],
+                    'gym': [{'name': 'LA Fitness', 'rating': 4.0}, {'name': 'Planet Fitness', 'rating': 4.1}],
+                    'shopping_mall': [{'name': 'NorthPark Center', 'rating': 4.5}],
+                    'pharmacy': [{'name': 'CVS Pharmacy', 'rating': 3.9}, {'name': 'Walgreens', 'rating': 4.0}]
+                }
+                for amenity, places in mock_data.items():
+                    lifestyle_data[amenity] = {
+                        'count': len(places),
+                        'avg_rating': sum([place.get('rating', 0) for place in places]) / max(len(places), 1),
+                        'top_places': [place.get('name', 'Unknown') for place in places[:3]]
                     }
-                    for amenity, places in mock_data.items():
-                        lifestyle_data[amenity] = {
-                            'count': len(places),
-                            'avg_rating': sum([place.get('rating', 0) for place in places]) / max(len(places), 1),
-                            'top_places': [place.get('name', 'Unknown') for place in places[:3]]
-                        }
-
-                # Build lifestyle insight string with real data
-                grocery_count = lifestyle_data['grocery_store']['count']
-                restaurant_count = lifestyle_data['restaurant']['count']
-                grocery_names = lifestyle_data['grocery_store']['top_places'][:2]  # Top 2 names
-
-                # Build the insight string
-                parts = []
-                if grocery_count > 0:
-                    if grocery_names:
-                        grocery_part = f"{grocery_count} grocery stores ({', '.join(grocery_names)})"
-                    else:
-                        grocery_part = f"{grocery_count} grocery stores"
-                    parts.append(grocery_part)
 
-                if restaurant_count > 0:
-                    parts.append(f"{restaurant_count} restaurants")
+            # Build lifestyle insight string with real data
+            grocery_count = lifestyle_data['grocery_store']['count']
+            restaurant_count = lifestyle_data['restaurant']['count']
+            grocery_names = lifestyle_data['grocery_store']['top_places'][:2]  # Top 2 names
 
-                if parts:
-                    lifestyle_insight = f"{', '.join(parts)} nearby"
+            # Build the insight string
+            parts = []
+            if grocery_count > 0:
+                if grocery_names:
+                    grocery_part = f"{grocery_count} grocery stores ({', '.join(grocery_names)})"
                 else:
-                    lifestyle_insight = "Limited amenities nearby"
+                    grocery_part = f"{grocery_count} grocery stores"
+                parts.append(grocery_part)
 
-                print(f"✅ Final lifestyle insight: {lifestyle_insight}")
+            if restaurant_count > 0:
+                parts.append(f"{restaurant_count} restaurants")
 
-                # Calculate totals for other metrics
-                total_amenities = sum([data['count'] for data in lifestyle_data.values()])
-                avg_rating = sum([data['avg_rating'] for data in lifestyle_data.values()]) / len(lifestyle_data) if lifestyle_data else 0
-
-                return {
-                    'total_amenities': total_amenities,
-                    'lifestyle_score': min(100, (total_amenities * 2) + (avg_rating * 10)),
-                    'grocery_options': grocery_count,
-                    'dining_options': restaurant_count,
-                    'fitness_options': lifestyle_data['gym']['count'],
-                    'shopping_options': lifestyle_data['shopping_mall']['count'],
-                    'convenience': lifestyle_data['pharmacy']['count'],
-                    'top_grocery': grocery_names[0] if grocery_names else 'None nearby',
-                    'lifestyle_insight': lifestyle_insight
-                }
+            if parts:
+                lifestyle_insight = f"{', '.join(parts)} nearby"
+            else:
+                lifestyle_insight = "Limited amenities nearby"
+
+            logger.debug("Final lifestyle insight: %s", lifestyle_insight)
+
+            # Calculate totals for other metrics
+            total_amenities = sum([data['count'] for data in lifestyle_data.values()])
+            avg_rating = sum([data['avg_rating'] for data in lifestyle_data.values()]) / len(lifestyle_data) if lifestyle_data else 0
+
+            lifestyle = {
+                'total_amenities': total_amenities,
+                'lifestyle_score': min(100, (total_amenities * 2) + (avg_rating * 10)),
+                'grocery_options': grocery_count,
+                'dining_options': restaurant_count,
+                'fitness_options': lifestyle_data['gym']['count'],
+                'shopping_options': lifestyle_data['shopping_mall']['count'],
+                'convenience': lifestyle_data['pharmacy']['count'],
+                'top_grocery': grocery_names[0] if grocery_names else 'None nearby',
+                'lifestyle_insight': lifestyle_insight
+            }
+            # A failed search reads as "no places"; don't let it pass for a real count
+            if self.google_api_key and any(places is None for places in responses):
+                lifestyle['data_source'] = 'fallback'
+            return lifestyle
 
         except Exception as e:
-            print(f"❌ Error fetching lifestyle info: {e}")
+            logger.warning("Error fetching lifestyle info: %s", e)
             return {
                 'total_amenities': 0,
                 'lifestyle_score': 0,
@@ -309,104 +428,177 @@ class PropertyInsightsService:
                 'shopping_options': 0,
                 'convenience': 0,
                 'top_grocery': 'Data unavailable',
-                'lifestyle_insight': 'Lifestyle data unavailable'
+                'lifestyle_insight': 'Lifestyle data unavailable',
+                'data_source': 'fallback'
             }
 
+    async def _nearby_places(self, session: aiohttp.ClientSession, lat: float, lng: float, search_type: str) -> Optional[List[Tuple[str, float]]]:
+        """(name, rating) per place from a nearby search for one type within 3km; None if the search failed"""
+        params = {
+            'location': f"{lat},{lng}",
+            'radius': 3000,  # 3km radius
+            'type': search_type,
+            'key': self.google_api_key
+        }
+
+        url = f"{self.google_places_base}/nearbysearch/json"
+        places = []
+
+        try:
+            logger.debug("Searching for %s near %s,%s", search_type, lat, lng)
+            data = await self._google_get(session, url, params)
+
+            if data.get('status') == 'OK':
+                results = data.get('results', [])
+                # Only name and rating are aggregated, so don't copy the rest
+                places = [(place.get('name', 'Unknown'), place.get('rating', 0)) for place in results]
+
+                logger.debug("Found %d %s locations", len(results), search_type)
+            elif data.get('status') == 'ZERO_RESULTS':
+                logger.debug("No %s found in area", search_type)
+            else:
+                logger.warning(
+                    "Google Places API error for %s: %s - %s",
+                    search_type, data.get('status'), data.get('error_message', 'Unknown error')
+                )
+                return None
+
+        except Exception as e:
+            logger.warning("Error calling Google Places API for %s: %s", search_type, e)
+            return None
+
+        return places
+
     async def get_school_info(self, lat: float, lng: float, state: str) -> Dict[str, Any]:
         """Fetch school district and quality information"""
         try:
-            async with aiohttp.ClientSession() as session:
-                if self.greatschools_api_key:
-                    # GreatSchools API call
-                    headers = {'X-API-Key': self.greatschools_api_key}
-                    params = {
-                        'lat': lat,
-                        'lon': lng,
-                        'radius': 5,  # 5 mile radius
-                        'sort': 'rating',
-                        'limit': 10
-                    }
+            session = self._get_session()
+            if self.greatschools_api_key:
+                # GreatSchools API call
+                headers = {'X-API-Key': self.greatschools_api_key}
+                params = {
+                    'lat': lat,
+                    'lon': lng,
+                    'radius': 5,  # 5 mile radius
+                    'sort': 'rating',
+                    'limit': 10
+                }
 
-                    url = f"{self.greatschools_base}/schools"
+                url = f"{self.greatschools_base}/schools"
+                async with self._request_sema:
                     async with session.get(url, headers=headers, params=params) as response:
-                        schools_data = await response.json()
-                        schools = schools_data.get('schools', [])
-                else:
-                    # Mock school data
-                    schools = [
-                        {'name': 'Highland Park Elementary', 'rating': 9, 'level': 'elementary', 'type': 'public'},
-                        {'name': 'Highland Park Middle School', 'rating': 8, 'level': 'middle', 'type': 'public'},
-                        {'name': 'Highland Park High School', 'rating': 10, 'level': 'high', 'type': 'public'},
-                        {'name': 'St. Monica Catholic School', 'rating': 7, 'level': 'elementary', 'type': 'private'}
-                    ]
+                        schools_data = orjson.loads(await response.read())
+                schools = schools_data.get('schools', [])
+            else:
+                # Mock school data
+                schools = [
+                    {'name': 'Highland Park Elementary', 'rating': 9, 'level': 'elementary', 'type': 'public'},
+                    {'name': 'Highland Park Middle School', 'rating': 8, 'level': 'middle', 'type': 'public'},
+                    {'name': 'Highland Park High School', 'rating': 10, 'level': 'high', 'type': 'public'},
+                    {'name': 'St. Monica Catholic School', 'rating': 7, 'level': 'elementary', 'type': 'private'}
+                ]
+
+            if schools:
+                # Calculate school metrics
+                elementary_schools = [s for s in schools if s.get('level') == 'elementary']
+                middle_schools = [s for s in schools if s.get('level') == 'middle']
+                high_schools = [s for s in schools if s.get('level') == 'high']
+
+                avg_rating = sum([school.get('rating', 0) for school in schools]) / len(schools)
+                best_elementary = max(elementary_schools, key=lambda x: x.get('rating', 0)) if elementary_schools else None
+                best_high = max(high_schools, key=lambda x: x.get('rating', 0)) if high_schools else None
 
-                if schools:
-                    # Calculate school metrics
-                    elementary_schools = [s for s in schools if s.get('level') == 'elementary']
-                    middle_schools = [s for s in schools if s.get('level') == 'middle']
-                    high_schools = [s for s in schools if s.get('level') == 'high']
-
-                    avg_rating = sum([school.get('rating', 0) for school in schools]) / len(schools)
-                    best_elementary = max(elementary_schools, key=lambda x: x.get('rating', 0)) if elementary_schools else None
-                    best_high = max(high_schools, key=lambda x: x.get('rating', 0)) if high_schools else None
-
-                    return {
-                        'district_rating': round(avg_rating, 1),
-                        'elementary_count': len(elementary_schools),
-                        'middle_count': len(middle_schools),
-                        'high_count': len(high_schools),
-                        'best_elementary': best_elementary['name'] if best_elementary else 'N/A',
-                        'best_elementary_rating': best_elementary['rating'] if best_elementary else 0,
-                        'best_high': best_high['name'] if best_high else 'N/A',
-                        'best_high_rating': best_high['rating'] if best_high else 0,
-                        'has_private_options': any(s.get('type') == 'private' for s in schools)
-                    }
-                else:
-                    return self._get_default_school_info()
+                return {
+                    'district_rating': round(avg_rating, 1),
+                    'elementary_count': len(elementary_schools),
+                    'middle_count': len(middle_schools),
+                    'high_count': len(high_schools),
+                    'best_elementary': best_elementary['name'] if best_elementary else 'N/A',
+                    'best_elementary_rating': best_elementary['rating'] if best_elementary else 0,
+                    'best_high': best_high['name'] if best_high else 'N/A',
+                    'best_high_rating': best_high['rating'] if best_high else 0,
+                    'has_private_options': any(s.get('type') == 'private' for s in schools)
+                }
+            else:
+                return self._get_default_school_info()
 
         except Exception as e:
-            print(f"Error fetching school info: {e}")
-            return self._get_default_school_info()
+            logger.warning("Error fetching school info: %s", e)
+            return {**DEFAULT_SCHOOL_INFO, 'data_source': 'fallback'}
 
-        def _get_default_school_info(self):
-            """Default school info when API is unavailable"""
-            return {
-                'district_rating': 7.0,
-                'elementary_count': 2,
-                'middle_count': 1,
-                'high_count': 1,
-                'best_elementary': 'Local Elementary School',
-                'best_elementary_rating': 7,
-                'best_high': 'Local High School',
-                'best_high_rating': 7,
-                'has_private_options': True
-            }
+    def _get_default_school_info(self) -> Dict[str, Any]:
+        """Default school info when API is unavailable (a copy, so callers may modify it)"""
+        return dict(DEFAULT_SCHOOL_INFO)
 
     async def _get_downtown_destination(self, city: str, state: str, origin_lat: float, origin_lng: float, session) -> str:
         """Find the correct downtown destination with distance validation to avoid overlapping coordinates"""
-        import math
+        # The downtown a city commutes to is the same for every property in it
+        key = (city.strip().lower(), state.strip().lower())
+        known = KNOWN_DOWNTOWNS.get(key)
+        if known is not None:
+            return known
+
+        cached = self._downtown_cache.get(key)
+        if cached is not None:
+            return cached
+
+        destination = await self._downtown_flight.do(
+            key, lambda: self._search_downtown_destination(city, state, origin_lat, origin_lng, session)
+        )
+        if destination is not None:
+            self._downtown_cache[key] = destination
+            return destination
+
+        # Step 4: Safe fallback if all else fails (not cached, so the next property retries)
+        fallback = f"Downtown {city.title()}, {state.upper()}"
+        logger.debug("Using safe fallback: %s", fallback)
+        return fallback
+
+    async def _search_downtown_destination(self, city: str, state: str, origin_lat: float, origin_lng: float, session) -> Optional[str]:
+        """Steps 1-3 of the downtown search; None when none of them finds one"""
 
-        def calculate_distance(lat1, lng1, lat2, lng2):
-            """Calculate distance between two points in miles using Haversine formula"""
-            R = 3959  # Earth's radius in miles
-            dlat = math.radians(lat2 - lat1)
-            dlng = math.radians(lng2 - lng1)
-            a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlng/2)**2
-            c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-            return R * c
+        def first_accepted(addresses, coords, accept, label):
+            """First candidate, in search order, whose distance passes accept (scored in one vectorized call)"""
+            found = [(address, lat, lng) for address, (lat, lng, _) in zip(addresses, coords) if lat and lng]
+            if not found:
+                return None
+
+            distances = haversine_miles(
+                origin_lat, origin_lng,
+                np.array([lat for _, lat, _ in found]),
+                np.array([lng for _, _, lng in found])
+            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "%s candidates: %s", label,
+                    ", ".join(f"{address} ({distance:.1f} mi)" for (address, _, _), distance in zip(found, distances))
+                )
+
+            accepted = np.flatnonzero(accept(distances))
+            if accepted.size == 0:
+                return None
+
+            downtown_address = found[accepted[0]][0]
+            logger.debug("Using %s: %s", label, downtown_address)
+            return downtown_address
 
         async def geocode_address(address):
             """Helper to geocode an address and return coordinates"""
+            cached = self._geocode_cache.get(address)
+            if cached is not None:
+                return cached
+
             geocode_url = "https://maps.googleapis.com/maps/api/geocode/json"
             params = {"address": address, "key": self.google_api_key}
             try:
-                async with session.get(geocode_url, params=params) as response:
-                    data = await response.json()
-                    if data.get("status") == "OK" and data.get("results"):
-                        location = data["results"][0]["geometry"]["location"]
-                        return location["lat"], location["lng"], data["results"][0]["formatted_address"]
+                data = await self._google_get(session, geocode_url, params)
+                if data.get("status") == "OK" and data.get("results"):
+                    location = data["results"][0]["geometry"]["location"]
+                    coords = (location["lat"], location["lng"], data["results"][0]["formatted_address"])
+                    self._geocode_cache[address] = coords
+                    return coords
             except Exception as e:
-                print(f"❌ Geocoding error for {address}: {e}")
+                logger.warning("Geocoding error for %s: %s", address, e)
             return None, None, None
 
         url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
@@ -414,101 +606,95 @@ class PropertyInsightsService:
         try:
             # Step 1: Try local downtown with distance validation
             query = f"Downtown {city}, {state}"
-            print(f"🏙️ Step 1: Searching for '{query}'")
+            logger.debug("Step 1: Searching for '%s'", query)
 
             params = {"query": query, "key": self.google_api_key}
-            async with session.get(url, params=params) as response:
-                data = await response.json()
-
-                if data.get("status") == "OK" and data.get("results"):
-                    for result in data.get("results", [])[:3]:  # Check top 3 results
-                        downtown_address = result["formatted_address"]
-                        dt_lat, dt_lng, _ = await geocode_address(downtown_address)
+            data = await self._google_get(session, url, params)
 
-                        if dt_lat and dt_lng:
-                            distance = calculate_distance(origin_lat, origin_lng, dt_lat, dt_lng)
-                            print(f"🏙️ Found downtown at {downtown_address}, distance: {distance:.1f} miles")
+            if data.get("status") == "OK" and data.get("results"):
+                addresses = [result["formatted_address"] for result in data["results"][:3]]  # Check top 3 results
+                coords = await asyncio.gather(*[geocode_address(address) for address in addresses])
 
-                            # Only accept local downtown if it's significantly far (> 3 miles)
-                            distance = calculate_distance(origin_lat, origin_lng, dt_lat, dt_lng)
-                            
-                            if distance < 2.0:
-                                print(f"⚠️ Rejected fake/duplicate downtown: {downtown_address}")
-                                continue  # keep searching
-                            else:
-                                print(f"✅ Using real downtown: {downtown_address}")
-                                return downtown_address
+                # Only accept local downtown if it's significantly far (>= 2 miles);
+                # anything closer is a fake/duplicate downtown
+                downtown_address = first_accepted(addresses, coords, lambda d: d >= 2.0, "real downtown")
+                if downtown_address:
+                    return downtown_address
 
 
             # Step 2: If local downtown is too close, try nearby major metro
             fallback_query = f"major downtown near {city}, {state}"
-            print(f"🏙️ Step 2: Searching for '{fallback_query}'")
+            logger.debug("Step 2: Searching for '%s'", fallback_query)
 
             params = {"query": fallback_query, "key": self.google_api_key}
-            async with session.get(url, params=params) as response:
-                data = await response.json()
+            data = await self._google_get(session, url, params)
 
-                if data.get("status") == "OK" and data.get("results"):
-                    for result in data.get("results", [])[:3]:  # Check top 3 results
-                        downtown_address = result["formatted_address"]
-                        dt_lat, dt_lng, _ = await geocode_address(downtown_address)
+            if data.get("status") == "OK" and data.get("results"):
+                addresses = [result["formatted_address"] for result in data["results"][:3]]  # Check top 3 results
+                coords = await asyncio.gather(*[geocode_address(address) for address in addresses])
 
-                        if dt_lat and dt_lng:
-                            distance = calculate_distance(origin_lat, origin_lng, dt_lat, dt_lng)
-                            print(f"🏙️ Found major downtown at {downtown_address}, distance: {distance:.1f} miles")
-
-                            # Use any major downtown that's reasonably far (> 2 miles for major metros)
-                            if distance > 2.0:
-                                print(f"✅ Using major metro downtown: {downtown_address}")
-                                return downtown_address
+                # Use any major downtown that's reasonably far (> 2 miles for major metros)
+                downtown_address = first_accepted(addresses, coords, lambda d: d > 2.0, "major metro downtown")
+                if downtown_address:
+                    return downtown_address
 
             # Step 3: Try nearby major cities based on state
-            major_city_queries = []
-            if state.lower() in ['nj', 'new jersey']:
-                major_city_queries = ["Downtown Newark, NJ", "Downtown Jersey City, NJ", "Downtown Trenton, NJ"]
-            elif state.lower() in ['tx', 'texas']:
-                major_city_queries = ["Downtown Dallas, TX", "Downtown Houston, TX", "Downtown Austin, TX"]
-            elif state.lower() in ['ca', 'california']:
-                major_city_queries = ["Downtown Los Angeles, CA", "Downtown San Francisco, CA", "Downtown San Diego, CA"]
-            elif state.lower() in ['ny', 'new york']:
-                major_city_queries = ["Downtown Manhattan, NY", "Downtown Albany, NY", "Downtown Buffalo, NY"]
-            elif state.lower() in ['fl', 'florida']:
-                major_city_queries = ["Downtown Miami, FL", "Downtown Orlando, FL", "Downtown Jacksonville, FL"]
-            else:
+            major_city_queries = STATE_MAJOR_CITY_QUERIES.get(state.lower()) or (
                 # Generic state capital approach
-                major_city_queries = [f"Downtown {state} capital", f"largest city in {state} downtown"]
+                f"Downtown {state} capital", f"largest city in {state} downtown"
+            )
 
-            print(f"🏙️ Step 3: Trying major cities for {state}")
-            for major_query in major_city_queries:
-                print(f"🏙️ Trying: '{major_query}'")
-                params = {"query": major_query, "key": self.google_api_key}
-                async with session.get(url, params=params) as response:
-                    data = await response.json()
+            logger.debug("Step 3: Trying major cities for %s", state)
+
+            async def text_search(query):
+                logger.debug("Trying: '%s'", query)
+                params = {"query": query, "key": self.google_api_key}
+                return await self._google_get(session, url, params)
+
+            # Search every candidate city at once, then take the first acceptable one in order
+            searches = await asyncio.gather(
+                *[text_search(major_query) for major_query in major_city_queries],
+                return_exceptions=True
+            )
+            addresses = []
+            for data in searches:
+                if isinstance(data, BaseException):
+                    logger.warning("Text search error: %s", data)
+                    continue
 
-                    if data.get("status") == "OK" and data.get("results"):
-                        for result in data.get("results", [])[:2]:  # Check top 2 results
-                            downtown_address = result["formatted_address"]
-                            dt_lat, dt_lng, _ = await geocode_address(downtown_address)
+                if data.get("status") == "OK" and data.get("results"):
+                    addresses.extend(result["formatted_address"] for result in data["results"][:2])  # Check top 2 results
 
-                            if dt_lat and dt_lng:
-                                distance = calculate_distance(origin_lat, origin_lng, dt_lat, dt_lng)
-                                print(f"🏙️ Found major city downtown at {downtown_address}, distance: {distance:.1f} miles")
+            # Geocode every candidate across all cities together, then keep query order
+            coords = await asyncio.gather(*[geocode_address(address) for address in addresses])
 
-                                # Accept any major city that's reasonably far
-                                if distance > 5.0:  # Major cities should be at least 5 miles away
-                                    print(f"✅ Using major city downtown: {downtown_address}")
-                                    return downtown_address
+            # Accept any major city that's reasonably far (at least 5 miles away)
+            downtown_address = first_accepted(addresses, coords, lambda d: d > 5.0, "major city downtown")
+            if downtown_address:
+                return downtown_address
 
         except Exception as e:
-            print(f"❌ Error determining downtown for {city}, {state}: {e}")
+            logger.warning("Error determining downtown for %s, %s: %s", city, state, e)
 
-        # Step 4: Safe fallback if all else fails
-        fallback = f"Downtown {city.title()}, {state.upper()}"
-        print(f"🔄 Using safe fallback: {fallback}")
-        return fallback
+        return None
 
     async def get_all_insights(self, address: str, lat: float, lng: float, city: str, state: str) -> Dict[str, Any]:
-        """Fetch all property insights concurrently"""
+        """
+        Fetch all property insights concurrently
+
+        Each caller gets its own top-level dict, since properties sharing a grid
+        cell are handed the same cached entry and callers set per-property keys.
+        """
+        key = (
+            round(lat, INSIGHTS_GRID_DECIMALS),
+            round(lng, INSIGHTS_GRID_DECIMALS),
+            city.lower(),
+            state.lower()
+        )
+        cached = self._insights_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
         try:
             # Run all API calls concurrently for better performance
             neighborhood_task = self.get_neighborhood_info(address, lat, lng)
@@ -516,20 +702,27 @@ class PropertyInsightsService:
             lifestyle_task = self.get_lifestyle_info(lat, lng)
             school_task = self.get_school_info(lat, lng, state)
 
-            neighborhood, commute, lifestyle, schools = await asyncio.gather(
-                neighborhood_task, commute_task, lifestyle_task, school_task
+            # On timeout the except branch below returns the fallback
+            neighborhood, commute, lifestyle, schools = await asyncio.wait_for(
+                asyncio.gather(neighborhood_task, commute_task, lifestyle_task, school_task),
+                timeout=ALL_INSIGHTS_TIMEOUT
             )
 
-            return {
+            insights = {
                 'neighborhood': neighborhood,
                 'commute': commute,
                 'lifestyle': lifestyle,
                 'schools': schools,
                 'data_source': 'real_apis'
             }
+            # Fallback results (a failed lookup, or the except branch below) are never
+            # cached, so the next property in this cell retries them
+            if not any(part.get('data_source') == 'fallback' for part in (neighborhood, commute, lifestyle, schools)):
+                self._insights_cache[key] = insights
+            return dict(insights)
 
         except Exception as e:
-            print(f"Error fetching all insights: {e}")
+            logger.warning("Error fetching all insights: %r", e)
             return {
                 'neighborhood': {'walkability': {'walk_score': 50}},
                 'commute': {'driving_to_downtown': '25 mins'},
@@ -538,5 +731,19 @@ class PropertyInsightsService:
                 'data_source': 'fallback'
             }
 
+    async def get_bulk_insights(self, properties: List[Dict[str, Any]]) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Fetch insights for a whole page of properties at once, in the order given
+
+        Each entry carries get_all_insights() keyword arguments (address, lat,
+        lng, city, state). All properties share the pooled session and the
+        request semaphore, so the page fans out concurrently but stays bounded.
+        Returns each property's insights, or the exception raised for it.
+        """
+        return await asyncio.gather(
+            *[self.get_all_insights(**prop) for prop in properties],
+            return_exceptions=True
+        )
+
 # Global service instance
 property_insights_service = PropertyInsightsService()
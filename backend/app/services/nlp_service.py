@@ -1,9 +1,137 @@
-import openai
-from typing import Dict, List
+import asyncio
+import hashlib
+import logging
+import random
+from typing import Dict, List, Optional
+import aiohttp
+import orjson
+from ..core.cache import LayeredCache
 from ..core.config import settings
+from ..core.ratelimit import TokenBucket
 
+logger = logging.getLogger(__name__)
 
-def analyze_listing(description: str) -> Dict[str, any]:
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+OPENAI_TIMEOUT = aiohttp.ClientTimeout(total=60, connect=5)
+
+# Attempts per completion when OpenAI rate-limits us, errors server-side or the connection drops
+OPENAI_MAX_ATTEMPTS = 5
+
+# Listings packed into one completion by analyze_listings_bulk()
+BULK_CHUNK_SIZE = 10
+
+# Identical descriptions (e.g. many units of one complex) get the same analysis
+ANALYSIS_CACHE_TTL = 86400
+
+_NO_DESCRIPTION = {
+    "ai_summary": "No description provided for analysis",
+    "pros": [],
+    "cons": ["No description available"]
+}
+
+_session: Optional[aiohttp.ClientSession] = None
+_sem: Optional[asyncio.Semaphore] = None
+
+# Stay under the OpenAI RPM/TPM quotas up front instead of discovering them via 429s
+_request_bucket = TokenBucket(
+    rate=settings.openai_requests_per_minute / 60,
+    capacity=settings.openai_requests_per_minute
+)
+_token_bucket = TokenBucket(
+    rate=settings.openai_tokens_per_minute / 60,
+    capacity=settings.openai_tokens_per_minute
+)
+
+# Successful analyses keyed by a hash of their input; failures are never cached
+_listing_cache = LayeredCache("nlp:listing:", ANALYSIS_CACHE_TTL, maxsize=4096)
+_search_cache = LayeredCache("nlp:search:", ANALYSIS_CACHE_TTL, maxsize=1024)
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+class _RetryableOpenAIError(Exception):
+    """A 429 or 5xx from OpenAI; worth retrying after a backoff"""
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """
+    Shared session so every analysis reuses pooled keep-alive connections to OpenAI
+
+    Completions are posted directly rather than through the OpenAI SDK, whose
+    httpx transport is the bottleneck when dozens of completions are in flight.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=75),
+            timeout=OPENAI_TIMEOUT,
+            headers={"Authorization": f"Bearer {settings.openai_api_key}"},
+            json_serialize=lambda body: orjson.dumps(body).decode()
+        )
+    return _session
+
+
+def _get_sem() -> asyncio.Semaphore:
+    # Created lazily so it binds to the running event loop, not the import-time one
+    global _sem
+    if _sem is None:
+        _sem = asyncio.Semaphore(settings.openai_max_concurrency)
+    return _sem
+
+
+async def aclose() -> None:
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+async def _complete(
+    messages: List[Dict[str, str]],
+    max_tokens: int,
+    response_format: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Run one chat completion under the concurrency cap
+
+    Each attempt first takes one request and its estimated tokens (prompt
+    characters / 4 plus max_tokens) from the per-minute buckets. Rate limits,
+    server errors and dropped connections are retried with jittered exponential
+    backoff; the semaphore is released while sleeping so other calls proceed.
+    """
+    body = {
+        "model": "gpt-4o-mini",
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "temperature": 0.3
+    }
+    if response_format:
+        body["response_format"] = response_format
+
+    estimated_tokens = sum(len(m["content"]) for m in messages) // 4 + max_tokens
+    for attempt in range(OPENAI_MAX_ATTEMPTS):
+        await _request_bucket.acquire()
+        await _token_bucket.acquire(estimated_tokens)
+        try:
+            async with _get_sem():
+                async with _get_session().post(OPENAI_CHAT_URL, json=body) as response:
+                    raw = await response.read()
+                    if response.status == 429 or response.status >= 500:
+                        raise _RetryableOpenAIError(f"HTTP {response.status}")
+                    if response.status != 200:
+                        raise Exception(f"OpenAI API error: {response.status} - {raw.decode(errors='replace')}")
+            return orjson.loads(raw)["choices"][0]["message"]["content"].strip()
+        except (_RetryableOpenAIError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if attempt == OPENAI_MAX_ATTEMPTS - 1:
+                raise
+            delay = 2 ** attempt + random.random()
+            logger.warning("OpenAI call failed (%s), retrying in %.1fs", type(e).__name__, delay)
+            await asyncio.sleep(delay)
+
+
+async def analyze_listing(description: str) -> Dict[str, any]:
     """
     Analyze a property listing using OpenAI GPT to extract insights
 
@@ -17,13 +145,12 @@ def analyze_listing(description: str) -> Dict[str, any]:
         raise ValueError("OpenAI API key not configured")
 
     if not description or not description.strip():
-        return {
-            "ai_summary": "No description provided for analysis",
-            "pros": [],
-            "cons": ["No description available"]
-        }
+        return dict(_NO_DESCRIPTION)
 
-    client = openai.OpenAI(api_key=settings.openai_api_key)
+    key = _digest(description)
+    cached = await _listing_cache.get(key)
+    if cached is not None:
+        return cached
 
     prompt = f"""
     Analyze this real estate listing description and provide insights for potential buyers/renters.
@@ -44,28 +171,25 @@ def analyze_listing(description: str) -> Dict[str, any]:
     """
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        content = await _complete(
+            [
                 {"role": "system", "content": "You are a real estate expert helping analyze property listings. Always respond with valid JSON."},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=500,
-            temperature=0.3
+            max_tokens=500
         )
 
-        content = response.choices[0].message.content.strip()
-
         # Try to parse JSON response
-        import json
         try:
-            result = json.loads(content)
-            return {
+            result = orjson.loads(content)
+            analysis = {
                 "ai_summary": result.get("ai_summary", "Analysis completed"),
                 "pros": result.get("pros", []),
                 "cons": result.get("cons", [])
             }
-        except json.JSONDecodeError:
+            await _listing_cache.set(key, analysis)
+            return analysis
+        except orjson.JSONDecodeError:
             # Fallback if JSON parsing fails
             return {
                 "ai_summary": "AI analysis completed but formatting error occurred",
@@ -81,7 +205,116 @@ def analyze_listing(description: str) -> Dict[str, any]:
         }
 
 
-def generate_search_insights(listings: List[Dict]) -> Dict[str, any]:
+async def analyze_listings_batch(descriptions: List[str]) -> List[Dict[str, any]]:
+    """
+    Analyze several descriptions concurrently, in input order
+
+    Concurrency is capped by settings.openai_max_concurrency across all callers.
+    """
+    return await asyncio.gather(*(analyze_listing(d) for d in descriptions))
+
+
+async def _analyze_chunk(descriptions: List[str]) -> Dict[int, Dict[str, any]]:
+    """
+    Analyze up to BULK_CHUNK_SIZE descriptions in one completion
+
+    Returns results keyed by 1-based position; positions the model skipped or
+    mangled are simply absent so the caller can retry them individually.
+    """
+    numbered = "\n".join(f"{i}) {d}" for i, d in enumerate(descriptions, 1))
+    prompt = f"""
+    Analyze each of the following {len(descriptions)} real estate listing descriptions and provide insights for potential buyers/renters.
+
+    {numbered}
+
+    For each listing provide a brief summary (2-3 sentences), top 3-5 pros and top 3-5 cons.
+
+    Respond in this exact JSON format, with one entry per listing:
+    {{
+        "results": [
+            {{"index": 1, "ai_summary": "Brief summary here", "pros": ["Pro 1", "Pro 2"], "cons": ["Con 1", "Con 2"]}}
+        ]
+    }}
+    """
+
+    try:
+        content = await _complete(
+            [
+                {"role": "system", "content": "You are a real estate expert helping analyze property listings. Always respond with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=500 * len(descriptions),
+            response_format={"type": "json_object"}
+        )
+        entries = orjson.loads(content).get("results", [])
+    except Exception:
+        logger.warning("Bulk listing analysis failed for %d listings", len(descriptions), exc_info=True)
+        return {}
+
+    results = {}
+    for entry in entries:
+        if isinstance(entry, dict) and isinstance(entry.get("index"), int):
+            results[entry["index"]] = {
+                "ai_summary": entry.get("ai_summary", "Analysis completed"),
+                "pros": entry.get("pros", []),
+                "cons": entry.get("cons", [])
+            }
+    return results
+
+
+async def analyze_listings_bulk(descriptions: List[str]) -> List[Dict[str, any]]:
+    """
+    Analyze many descriptions with one completion per BULK_CHUNK_SIZE listings
+
+    The fixed instructions are sent once per chunk instead of once per listing.
+    Any listing missing from a chunk's answer falls back to analyze_listing().
+
+    Args:
+        descriptions: Property description texts to analyze
+
+    Returns:
+        One ai_summary/pros/cons dictionary per description, in input order
+    """
+    if not settings.openai_api_key:
+        raise ValueError("OpenAI API key not configured")
+
+    results: List[Optional[Dict[str, any]]] = [None] * len(descriptions)
+    keys = [_digest(d) if d and d.strip() else None for d in descriptions]
+    cached = await asyncio.gather(*(_listing_cache.get(k) for k in keys if k is not None))
+    cached_iter = iter(cached)
+
+    pending = []
+    for i, key in enumerate(keys):
+        if key is None:
+            results[i] = dict(_NO_DESCRIPTION)
+            continue
+        hit = next(cached_iter)
+        if hit is not None:
+            results[i] = hit
+        else:
+            pending.append(i)
+
+    chunks = [pending[i:i + BULK_CHUNK_SIZE] for i in range(0, len(pending), BULK_CHUNK_SIZE)]
+    answers = await asyncio.gather(*(_analyze_chunk([descriptions[i] for i in chunk]) for chunk in chunks))
+
+    missing = []
+    for chunk, answer in zip(chunks, answers):
+        for position, i in enumerate(chunk, 1):
+            if position in answer:
+                results[i] = answer[position]
+                await _listing_cache.set(keys[i], answer[position])
+            else:
+                missing.append(i)
+
+    if missing:
+        logger.info("Re-analyzing %d listings missing from bulk answers", len(missing))
+        for i, result in zip(missing, await analyze_listings_batch([descriptions[i] for i in missing])):
+            results[i] = result
+
+    return results
+
+
+async def generate_search_insights(listings: List[Dict]) -> Dict[str, any]:
     """
     Generate insights about a collection of listings
 
@@ -100,8 +333,6 @@ def generate_search_insights(listings: List[Dict]) -> Dict[str, any]:
             "recommendations": []
         }
 
-    client = openai.OpenAI(api_key=settings.openai_api_key)
-
     # Prepare listings summary for analysis
     listings_summary = []
     for listing in listings[:10]:  # Limit to first 10 for token efficiency
@@ -114,6 +345,11 @@ def generate_search_insights(listings: List[Dict]) -> Dict[str, any]:
         }
         listings_summary.append(summary)
 
+    key = _digest(orjson.dumps(listings_summary, default=str, option=orjson.OPT_SORT_KEYS).decode())
+    cached = await _search_cache.get(key)
+    if cached is not None:
+        return cached
+
     prompt = f"""
     Analyze these real estate listings and provide market insights:
 
@@ -131,22 +367,19 @@ def generate_search_insights(listings: List[Dict]) -> Dict[str, any]:
     """
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        content = await _complete(
+            [
                 {"role": "system", "content": "You are a real estate market analyst. Always respond with valid JSON."},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=400,
-            temperature=0.3
+            max_tokens=400
         )
 
-        content = response.choices[0].message.content.strip()
-
-        import json
         try:
-            return json.loads(content)
-        except json.JSONDecodeError:
+            insights = orjson.loads(content)
+            await _search_cache.set(key, insights)
+            return insights
+        except orjson.JSONDecodeError:
             return {
                 "market_summary": "Market analysis completed",
                 "recommendations": ["Analysis available"]
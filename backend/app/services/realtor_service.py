@@ -1,8 +1,34 @@
-from typing import List, Dict, Any, Optional
+import asyncio
+import heapq
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, AsyncIterator, Iterator, Callable, Set, Tuple, Union
 from fastapi import HTTPException
 import httpx
+import orjson
+from cachetools import LRUCache, TTLCache
+from ..core.cache import SingleFlight
 from ..core.config import settings
-import json
+
+logger = logging.getLogger(__name__)
+
+# Relative to the client's RapidAPI base_url
+SEARCH_PATH = "/properties/v3/list"
+
+# Fields every search sends; per-search fields are layered on top. Never mutated
+SEARCH_PAYLOAD_BASE = {
+    "limit": 50,
+    "offset": 0,
+    "sort": {"direction": "desc", "field": "list_date"},
+}
+
+LISTING_TYPES = {"rent": "for_rent", "buy": "for_sale"}
+
+# Concurrent searches per fetch_realtor_listings_bulk() call
+REALTOR_BULK_CONCURRENCY = 16
 
 PROPERTY_TYPE_MAP = {
     "apartment": "apartment_condo",
@@ -11,6 +37,139 @@ PROPERTY_TYPE_MAP = {
     "townhouse": "townhouse"
 }
 
+# Raw RapidAPI result pages per search payload. Searches differing only in ranking
+# limit, or in a max_price within the same upstream price window, share one page
+REALTOR_PAGE_CACHE_TTL = 180
+
+# Ranked listings per normalized search; repeat searches skip the fetch, parse and ranking.
+# Past the soft TTL an entry is still served, and refreshed in the background
+REALTOR_RESULTS_SOFT_TTL = 300
+REALTOR_RESULTS_CACHE_TTL = 2 * REALTOR_RESULTS_SOFT_TTL
+
+# Match tiers from _evaluate_listing_match(); None means rejected. Higher ranks sort first
+MATCH_PERFECT = 2
+MATCH_GOOD = 1
+MATCH_ACCEPTABLE = 0
+
+
+def _rank_score(tier: int, listing: "RealtorListing") -> float:
+    """
+    One number ordering listings by tier, then having a price, bedrooms and sqft,
+    then lower price
+
+    Each weight exceeds everything below it (listing prices are far under 1e9),
+    so comparing scores orders like comparing the equivalent tuples.
+    """
+    price = listing.price
+    return (
+        tier * 1e12
+        + (1e11 if price else 0.0)
+        + (1e10 if listing.bedrooms else 0.0)
+        + (1e9 if listing.square_feet else 0.0)
+        - (price or 99999)
+    )
+
+# Listing text that marks a listing as (or rules it out as) an apartment
+_APARTMENT_RE = re.compile(r"apartment|apt|complex|community")
+_NOT_APARTMENT_RE = re.compile(r"single_family|single family|townhome|townhouse")
+
+# A URL "looks like an image" if it has an image extension or mentions photo/image
+_PHOTO_RE = re.compile(r"\.(?:jpe?g|png|webp)|photo|image", re.IGNORECASE)
+
+
+def _as_list(value: Any) -> List[Any]:
+    if isinstance(value, list):
+        return value
+    return [value] if value else []
+
+
+@dataclass(slots=True)
+class RealtorListing:
+    """
+    One parsed Realtor result
+
+    Ranking reads fields as slot attributes instead of dict lookups, and orjson
+    encodes slotted dataclasses natively, so API responses are unchanged.
+    """
+    id: str
+    title: str
+    description: str
+    price: Optional[float]
+    price_range: Optional[str]
+    bedrooms: Optional[int]
+    bathrooms: Optional[float]
+    square_feet: Optional[int]
+    city: str
+    state: str
+    address: Optional[str]
+    full_address: Optional[str]
+    latitude: Optional[float]
+    longitude: Optional[float]
+    url: str
+    source: str
+    photo_url: Optional[str]
+    photos: List[str] = field(default_factory=list)
+    beds_min: Optional[int] = None
+    beds_max: Optional[int] = None
+    sqft_min: Optional[int] = None
+    sqft_max: Optional[int] = None
+
+
+def _pick(d: Dict[str, Any], key: str, cast: Callable[[float], Any] = float) -> Any:
+    """
+    d[key], else the midpoint of d[key_min]/d[key_max] (passed through cast),
+    else whichever bound is present
+    """
+    value = d.get(key)
+    if value is not None:
+        return value
+    low = d.get(f"{key}_min")
+    high = d.get(f"{key}_max")
+    if low is not None and high is not None:
+        return cast((low + high) / 2)
+    return low if low is not None else high
+
+
+def _as_int(value: Any) -> Optional[int]:
+    """value as an int, or None when missing; ints (the usual JSON case) skip the int() call"""
+    if value is None:
+        return None
+    return value if type(value) is int else int(value)
+
+
+def _as_float(value: Any) -> Optional[float]:
+    """value as a float, or None when missing; floats skip the float() call"""
+    if value is None:
+        return None
+    return value if type(value) is float else float(value)
+
+
+def _price_range(low: Any, high: Any, suffix: str) -> Tuple[Any, Optional[str]]:
+    """(price, display range) from optional price bounds; (None, None) when neither is set"""
+    if low and high:
+        return (low + high) / 2, f"${int(low):,} - ${int(high):,}{suffix}"
+    if low:
+        return low, f"From ${int(low):,}{suffix}"
+    if high:
+        return high, f"Up to ${int(high):,}{suffix}"
+    return None, None
+
+
+def _photo_collections(prop: Dict[str, Any], description: Dict[str, Any], community: Dict[str, Any]) -> Iterator[Any]:
+    """
+    Candidate photo collections in the order the Realtor API might use them
+
+    Yielded lazily so the later fields are only looked up when the earlier
+    ones are empty.
+    """
+    yield prop.get("photos")
+    yield _as_list(prop.get("photo"))
+    yield prop.get("images")
+    yield _as_list(prop.get("picture"))
+    yield _as_list(prop.get("primary_photo"))
+    yield description.get("photos")
+    yield community.get("photos")
+
 
 class RealtorService:
     """Service for fetching listings from Realtor.com API via RapidAPI"""
@@ -20,11 +179,48 @@ class RealtorService:
         self.rapidapi_host = settings.rapidapi_host
 
         if not self.rapidapi_key:
-            print("Warning: RAPIDAPI_KEY not found - realtor service will be disabled")
+            logger.warning("RAPIDAPI_KEY not found - realtor service will be disabled")
             self.enabled = False
         else:
             self.enabled = True
 
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self._page_cache: TTLCache = TTLCache(maxsize=1024, ttl=REALTOR_PAGE_CACHE_TTL)
+
+        # property_id -> (raw result, parsed listing). Cached pages hand back the same
+        # raw dicts, so an identity check validates a hit without hashing the payload
+        self._parse_cache: LRUCache = LRUCache(maxsize=4096)
+        self._page_flight = SingleFlight()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Shared client reused across requests
+
+        Keeps TLS connections to RapidAPI alive between searches, and HTTP/2
+        multiplexes concurrent searches over one connection.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=f"https://{self.rapidapi_host}",
+                http2=True,
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=30.0),
+                headers={
+                    "X-RapidAPI-Key": self.rapidapi_key or "",
+                    "X-RapidAPI-Host": self.rapidapi_host,
+                    "Content-Type": "application/json",
+                    # The 50-result search page is JSON; compressed it is several times smaller
+                    "Accept-Encoding": "gzip, br",
+                },
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
     async def fetch_realtor_listings(
         self,
         city: str,
@@ -34,37 +230,29 @@ class RealtorService:
         limit: int = 10,
         search_type: str = "rent",  # "rent" or "buy"
         property_type: Optional[str] = None,
-    ) -> List[Dict[str, Any]]:
-        headers = {
-            "X-RapidAPI-Key": self.rapidapi_key,
-            "X-RapidAPI-Host": self.rapidapi_host,
-            "Content-Type": "application/json",
-        }
-
-        url = f"https://{self.rapidapi_host}/properties/v3/list"
-
-        # Map search_type to API listing_type
-        if search_type == "rent":
-            listing_type = "for_rent"
-        elif search_type == "buy":
-            listing_type = "for_sale"
-        else:
-            listing_type = "for_rent"  # Default to rent
+        refresh: bool = False,
+    ) -> List[RealtorListing]:
+        """
+        Ranked listings for one city
+
+        property_type may be comma-separated (e.g. "apartment,condo"); each
+        distinct API property type is then searched concurrently and the pages
+        merged before filtering and ranking. refresh skips the page cache.
+        """
+        # Without a key every call would be rejected upstream; fail before the round-trip
+        if not self.enabled:
+            raise HTTPException(status_code=503, detail="Realtor API is not configured (RAPIDAPI_KEY missing)")
+
+        # Map search_type to API listing_type, defaulting to rent
+        listing_type = LISTING_TYPES.get(search_type, "for_rent")
 
         payload = {
-            "limit": 50,
-            "offset": 0,
+            **SEARCH_PAYLOAD_BASE,
             "city": city,
             "state_code": state_code.upper(),
             "status": [listing_type],
-            "sort": {"direction": "desc", "field": "list_date"},
         }
 
-        if property_type:
-            api_property_type = PROPERTY_TYPE_MAP.get(property_type.lower())
-            if api_property_type:
-                payload["property_type"] = api_property_type
-
         if max_price:
             if search_type == "rent":
                 payload["price_max"] = int(max_price * 1.2)
@@ -73,62 +261,60 @@ class RealtorService:
                 payload["price_max"] = int(max_price * 1.1)
                 payload["price_min"] = 50000
 
+        # Let the API drop homes far off the bedroom target before they are sent and parsed;
+        # the window is one bedroom wide either side, so unit-mix complexes spanning the
+        # target still come back and _evaluate_listing_match makes the exact call
+        if bedrooms is not None:
+            payload["beds_min"] = max(0, bedrooms - 1)
+            payload["beds_max"] = bedrooms + 1
+
+        requested_types = [t.strip() for t in (property_type or "").split(",") if t.strip()]
+
+        # One search per distinct API type; a type the API can't filter on needs the unfiltered search
+        api_types = {PROPERTY_TYPE_MAP.get(t.lower()) for t in requested_types}
+        if not api_types or None in api_types:
+            payloads = [payload]
+        else:
+            payloads = [{**payload, "property_type": api_type} for api_type in sorted(api_types)]
+
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-                data = response.json()
-
-                properties = data.get("data", {}).get("home_search", {}).get("results", [])
-                if not properties:
-                    return []
-
-                all_listings = []
-                for prop in properties:
-                    listing = self._parse_listing(prop)
-                    if listing:
-                        all_listings.append(listing)
-
-                if property_type:
-                    type_filtered_listings = []
-                    for listing in all_listings:
-                        if self._matches_property_type(listing, property_type):
-                            type_filtered_listings.append(listing)
-                    all_listings = type_filtered_listings
-
-                perfect_matches = []
-                good_matches = []
-                acceptable_matches = []
-
-                for listing in all_listings:
-                    match_level = self._evaluate_listing_match(listing, bedrooms, max_price)
-
-                    if match_level == "perfect":
-                        perfect_matches.append(listing)
-                    elif match_level == "good":
-                        good_matches.append(listing)
-                    elif match_level == "acceptable":
-                        acceptable_matches.append(listing)
-
-                def sort_by_preference(listings):
-                    return sorted(
-                        listings,
-                        key=lambda x: (
-                            bool(x.get("price")),
-                            bool(x.get("bedrooms")),
-                            bool(x.get("square_feet")),
-                            -(x.get("price") or 99999)
-                        ),
-                        reverse=True
-                    )
-
-                perfect_matches = sort_by_preference(perfect_matches)
-                good_matches = sort_by_preference(good_matches)
-                acceptable_matches = sort_by_preference(acceptable_matches)
-
-                final_results = (perfect_matches + good_matches + acceptable_matches)[:limit]
-
-                return final_results
+            pages = await asyncio.gather(*(self._search_page(p, refresh) for p in payloads))
+            if len(pages) == 1:
+                properties = pages[0]
+            else:
+                # The same home can come back under more than one type; keep its first copy
+                seen = set()
+                properties = []
+                for page in pages:
+                    for prop in page:
+                        property_id = prop.get("property_id")
+                        if property_id is not None:
+                            if property_id in seen:
+                                continue
+                            seen.add(property_id)
+                        properties.append(prop)
+            if not properties:
+                return []
+
+            # One pass: parse, filter by type and score each listing. The match tier
+            # leads the score (perfect > good > acceptable), then preference within it
+            ranked = []
+            for prop in properties:
+                listing = self._parse_cached(prop)
+                if not listing:
+                    continue
+                if requested_types and not any(self._matches_property_type(listing, t) for t in requested_types):
+                    continue
+
+                tier = self._evaluate_listing_match(listing, bedrooms, max_price)
+                if tier is None:
+                    continue
+                ranked.append((_rank_score(tier, listing), listing))
+
+            # Same order as sorted(..., reverse=True)[:limit] without sorting the whole page
+            final_results = [listing for _, listing in heapq.nlargest(limit, ranked, key=itemgetter(0))]
+
+            return final_results
 
         except httpx.TimeoutException:
             raise HTTPException(status_code=408, detail="Realtor API request timed out")
@@ -137,8 +323,44 @@ class RealtorService:
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch listings: {str(e)}")
 
-    def _parse_listing(self, prop: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        print(f"🔍 DEBUG Location data: {json.dumps(prop.get('location', {}), indent=2)}")
+    async def _search_page(self, payload: Dict[str, Any], refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Raw results for one search payload, from the page cache when fresh
+
+        Concurrent misses for the same payload share a single POST. The
+        key-sorted orjson encoding is both the cache key and the request body.
+        With refresh the cached page is ignored (and replaced).
+        """
+        body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        cached = None if refresh else self._page_cache.get(body)
+        if cached is not None:
+            return cached
+
+        async def post() -> List[Dict[str, Any]]:
+            response = await self._get_client().post(SEARCH_PATH, content=body)
+            response.raise_for_status()
+            data = orjson.loads(response.content)
+            results = data.get("data", {}).get("home_search", {}).get("results", [])
+            self._page_cache[body] = results
+            return results
+
+        return await self._page_flight.do(body, post)
+
+    def _parse_cached(self, prop: Dict[str, Any]) -> Optional[RealtorListing]:
+        """_parse_listing(), reusing the previous result when prop is the same raw result"""
+        property_id = prop.get("property_id")
+        if property_id is None:
+            return self._parse_listing(prop)
+
+        cached = self._parse_cache.get(property_id)
+        if cached is not None and cached[0] is prop:
+            return cached[1]
+
+        listing = self._parse_listing(prop)
+        self._parse_cache[property_id] = (prop, listing)
+        return listing
+
+    def _parse_listing(self, prop: Dict[str, Any]) -> Optional[RealtorListing]:
         """Parse and normalize a property result from Realtor API"""
         try:
             location = prop.get("location") or {}
@@ -146,44 +368,26 @@ class RealtorService:
             description = prop.get("description") or {}
             community = prop.get("community") or {}
 
-            street_line = address.get("line", "")
-            street_number = address.get("street_number", "")
-            street_name = address.get("street_name", "")
+            # Each field is read once and reused below
+            address_line = address.get("line", "")
             city = address.get("city", "")
-            state = address.get("state_code", "")
+            state_code = address.get("state_code", "")
             postal_code = address.get("postal_code", "")
-
-            if street_line:
-                full_address = f"{street_line}, {city}, {state} {postal_code}"
-            elif street_number and street_name:
-                full_address = f"{street_number} {street_name}, {city}, {state} {postal_code}"
-            else:
-                full_address = f"{city}, {state}"
-            
-            # Debug log to see what we got
-            print(f"📍 Extracted address: {full_address}")
-        
+            beds_min = description.get("beds_min")
+            beds_max = description.get("beds_max")
 
             # Price extraction with proper range handling
-            price = None
-            price_range = None
-
             is_for_sale = "for_sale" in prop.get("status", "")
             price_suffix = "" if is_for_sale else "/mo"
 
+            # Equal list bounds are a single price, shown as "From $X"
             list_price_min = prop.get("list_price_min")
             list_price_max = prop.get("list_price_max")
-
-            if list_price_min or list_price_max:
-                if list_price_min and list_price_max and list_price_min != list_price_max:
-                    price_range = f"${int(list_price_min):,} - ${int(list_price_max):,}{price_suffix}"
-                    price = (list_price_min + list_price_max) / 2
-                elif list_price_min:
-                    price_range = f"From ${int(list_price_min):,}{price_suffix}"
-                    price = list_price_min
-                elif list_price_max:
-                    price_range = f"Up to ${int(list_price_max):,}{price_suffix}"
-                    price = list_price_max
+            price, price_range = _price_range(
+                list_price_min,
+                None if list_price_max == list_price_min else list_price_max,
+                price_suffix
+            )
 
             if not price:
                 price = (
@@ -194,75 +398,25 @@ class RealtorService:
                 )
 
             if not price_range and community:
-                community_price_min = community.get("price_min")
-                community_price_max = community.get("price_max")
-                if community_price_min or community_price_max:
-                    if community_price_min and community_price_max:
-                        price_range = f"${int(community_price_min):,} - ${int(community_price_max):,}{price_suffix}"
-                        price = (community_price_min + community_price_max) / 2
-                    elif community_price_min:
-                        price_range = f"From ${int(community_price_min):,}{price_suffix}"
-                        price = community_price_min
-                    elif community_price_max:
-                        price_range = f"Up to ${int(community_price_max):,}{price_suffix}"
-                        price = community_price_max
+                community_price, community_range = _price_range(
+                    community.get("price_min"), community.get("price_max"), price_suffix
+                )
+                if community_range:
+                    price, price_range = community_price, community_range
 
             if not price_range and price:
                 price_range = f"${int(price):,}{price_suffix}"
             elif not price and not price_range:
                 price_range = "Contact for pricing"
 
-            # Extract bedroom/bathroom/sqft info
-            bedrooms = description.get("beds")
-            bathrooms = description.get("baths")
-            square_feet = description.get("sqft")
-
-            if bedrooms is None:
-                beds_min = description.get("beds_min")
-                beds_max = description.get("beds_max")
-                if beds_min is not None and beds_max is not None:
-                    bedrooms = int((beds_min + beds_max) / 2)
-                elif beds_min is not None:
-                    bedrooms = beds_min
-                elif beds_max is not None:
-                    bedrooms = beds_max
-
-            if bathrooms is None:
-                baths_min = description.get("baths_min")
-                baths_max = description.get("baths_max")
-                if baths_min is not None and baths_max is not None:
-                    bathrooms = (baths_min + baths_max) / 2
-                elif baths_min is not None:
-                    bathrooms = baths_min
-                elif baths_max is not None:
-                    bathrooms = baths_max
-
-            if square_feet is None:
-                sqft_min = description.get("sqft_min")
-                sqft_max = description.get("sqft_max")
-                if sqft_min is not None and sqft_max is not None:
-                    square_feet = int((sqft_min + sqft_max) / 2)
-                elif sqft_min is not None:
-                    square_feet = sqft_min
-                elif sqft_max is not None:
-                    square_feet = sqft_max
+            # Extract bedroom/bathroom/sqft info, falling back to the unit-mix ranges
+            bedrooms = _pick(description, "beds", int)
+            bathrooms = _pick(description, "baths")
+            square_feet = _pick(description, "sqft", int)
 
-            address_line = address.get("line", "")
-            city = address.get("city", "")
-            state = address.get("state_code", "")  
             property_type = description.get("type", "")
 
-            if address_line and city and state:
-                full_address = f"{address_line}, {city}, {state}"
-            elif city and state:
-                full_address = f"{city}, {state}"
-            else:
-                full_address = None  # No usable address data
-
             # Build a proper full address (if available)
-            state_code = address.get("state_code", "")
-            postal_code = address.get("postal_code", "")
-
             full_address = None
             if address_line and city and state_code:
                 # Best case → use full street + city + state + ZIP
@@ -271,6 +425,9 @@ class RealtorService:
                     parts.append(str(postal_code))
                 full_address = ", ".join(parts)
 
+            # Guarded so the location dict is only serialized when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Realtor listing address %s from location %s", full_address, orjson.dumps(location))
 
             title_parts = []
             if bedrooms: title_parts.append(f"{bedrooms}BR")
@@ -281,44 +438,18 @@ class RealtorService:
             title = " ".join(title_parts) if title_parts else f"Property in {city}"
 
             desc_parts = []
-            if description.get("sub_type"): desc_parts.append(description["sub_type"].title())
+            sub_type = description.get("sub_type")
+            if sub_type: desc_parts.append(sub_type.title())
             if property_type: desc_parts.append(f"{property_type} property")
             if bedrooms and bathrooms: desc_parts.append(f"with {bedrooms} bedrooms and {bathrooms} bathrooms")
             if square_feet: desc_parts.append(f"({square_feet} sqft)")
-            if description.get("beds_min") and description.get("beds_max") and not description.get("beds"):
-                desc_parts.append(f"Available in {description['beds_min']}-{description['beds_max']} bedroom layouts")
+            if beds_min and beds_max and not description.get("beds"):
+                desc_parts.append(f"Available in {beds_min}-{beds_max} bedroom layouts")
             full_description = ". ".join(desc_parts) if desc_parts else "Rental property"
 
-            # Extract photos from multiple possible locations in the API response
-            photos_data = []
+            # Extract photos from the first non-empty collection the API populated
             primary_photo = None
-
-            # Try different photo field locations that Realtor API might use
-            possible_photo_fields = [
-                prop.get("photos", []),
-                prop.get("photo", []) if isinstance(prop.get("photo"), list) else ([prop.get("photo")] if prop.get("photo") else []),
-                prop.get("images", []),
-                prop.get("picture", []) if isinstance(prop.get("picture"), list) else ([prop.get("picture")] if prop.get("picture") else [])
-            ]
-
-            # Also check nested locations
-            if prop.get("primary_photo"):
-                possible_photo_fields.append([prop.get("primary_photo")])
-
-            # Check if photos are nested in other objects
-            description = prop.get("description", {})
-            if isinstance(description, dict) and description.get("photos"):
-                possible_photo_fields.append(description.get("photos", []))
-
-            community = prop.get("community", {})
-            if isinstance(community, dict) and community.get("photos"):
-                possible_photo_fields.append(community.get("photos", []))
-
-            # Find the first valid photo collection
-            for photo_collection in possible_photo_fields:
-                if photo_collection and len(photo_collection) > 0:
-                    photos_data = photo_collection
-                    break
+            photos_data = next((c for c in _photo_collections(prop, description, community) if c), [])
 
             # Extract photo URLs from the found collection
             photo_urls = []
@@ -352,7 +483,7 @@ class RealtorService:
                             photo_url = "https://" + photo_url
 
                         # Basic validation that it looks like an image URL
-                        if any(ext in photo_url.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp']) or 'photo' in photo_url.lower() or 'image' in photo_url.lower():
+                        if _PHOTO_RE.search(photo_url):
                             photo_urls.append(photo_url)
 
                 # Set primary photo as the first valid photo
@@ -366,66 +497,65 @@ class RealtorService:
                 latitude = coords.get("lat") or coords.get("latitude")
                 longitude = coords.get("lon") or coords.get("longitude")
 
-            return {
-                "id": str(prop.get("property_id", "")),
-                "title": title,
-                "description": full_description,
-                "price": float(price) if price else None,
-                "price_range": price_range,
-                "bedrooms": int(bedrooms) if bedrooms else None,
-                "bathrooms": float(bathrooms) if bathrooms else None,
-                "square_feet": int(square_feet) if square_feet else None,
-                "city": city,
-                "state": address.get("state_code", ""),
-                "address": full_address,  # ✅ exact property address
-                "full_address": full_address,
-
-                "latitude": latitude,     # ✅ NEW
-                "longitude": longitude,   # ✅ NEW
-                "url": prop.get("href", ""),
-                "source": "Realtor",
-                "photo_url": primary_photo,
-                "photos": photo_urls,
-                "beds_min": description.get("beds_min"),
-                "beds_max": description.get("beds_max"),
-                "sqft_min": description.get("sqft_min"),
-                "sqft_max": description.get("sqft_max"),
-            }
-        
-        
-
-        except Exception:
+            return RealtorListing(
+                id=str(prop.get("property_id", "")),
+                title=title,
+                description=full_description,
+                price=_as_float(price or None),  # A zero price means no price
+                price_range=price_range,
+                bedrooms=_as_int(bedrooms),  # 0 is a studio, not unknown
+                bathrooms=_as_float(bathrooms or None),
+                square_feet=_as_int(square_feet or None),
+                city=city,
+                state=state_code,
+                address=full_address,  # ✅ exact property address
+                full_address=full_address,
+                latitude=latitude,
+                longitude=longitude,
+                url=prop.get("href", ""),
+                source="Realtor",
+                photo_url=primary_photo,
+                photos=photo_urls,
+                beds_min=beds_min,
+                beds_max=beds_max,
+                sqft_min=description.get("sqft_min"),
+                sqft_max=description.get("sqft_max"),
+            )
+
+        # Malformed rows (a non-dict where an object was expected, a non-numeric
+        # price, ...) are skipped individually instead of failing the whole page
+        except (AttributeError, TypeError, ValueError):
+            logger.debug("Skipping unparseable Realtor result %s", prop.get("property_id"), exc_info=True)
             return None
 
-    def _matches_property_type(self, listing: Dict[str, Any], requested_type: str) -> bool:
-        description = listing.get("description", "").lower()
-        title = listing.get("title", "").lower()
+    def _matches_property_type(self, listing: RealtorListing, requested_type: str) -> bool:
+        description = listing.description.lower()
+        title = listing.title.lower()
+        requested = requested_type.lower()
 
-        if requested_type.lower() == "apartment":
-            apartment_keywords = ["apartment", "apt", "complex", "community"]
-            exclude_keywords = ["single_family", "single family", "townhome", "townhouse"]
-            url = listing.get("url", "").lower()
+        if requested == "apartment":
+            url = (listing.url or "").lower()
             has_apt_in_url = "apt" in url or "unit" in url
-            has_apartment_keywords = any(keyword in description or keyword in title for keyword in apartment_keywords)
-            has_exclude_keywords = any(keyword in description for keyword in exclude_keywords)
-            return (has_apartment_keywords or has_apt_in_url) and not has_exclude_keywords
+            has_apartment_keywords = bool(_APARTMENT_RE.search(description) or _APARTMENT_RE.search(title))
+            return (has_apartment_keywords or has_apt_in_url) and not _NOT_APARTMENT_RE.search(description)
 
-        elif requested_type.lower() == "condo":
+        elif requested == "condo":
             return "condo" in description or "condo" in title
-        elif requested_type.lower() in ["house", "single_family"]:
+        elif requested in ("house", "single_family"):
             return "single_family" in description or "single family" in description
-        elif requested_type.lower() == "townhouse":
+        elif requested == "townhouse":
             return "townhome" in description or "townhouse" in description
         return True
 
-    def _evaluate_listing_match(self, listing: Dict[str, Any], target_bedrooms: Optional[int], max_price: Optional[float]) -> str:
-        if not listing.get("city") or not listing.get("title"):
-            return "reject"
+    def _evaluate_listing_match(self, listing: RealtorListing, target_bedrooms: Optional[int], max_price: Optional[float]) -> Optional[int]:
+        """Match tier (MATCH_PERFECT / MATCH_GOOD / MATCH_ACCEPTABLE), or None to reject"""
+        if not listing.city or not listing.title:
+            return None
         
-        price = listing.get("price")
-        bedrooms = listing.get("bedrooms")
-        beds_min = listing.get("beds_min")
-        beds_max = listing.get("beds_max")
+        price = listing.price
+        bedrooms = listing.bedrooms
+        beds_min = listing.beds_min
+        beds_max = listing.beds_max
 
         price_match = "unknown"
         if price:
@@ -435,7 +565,7 @@ class RealtorService:
                 elif price <= max_price * 1.1:
                     price_match = "acceptable"
                 else:
-                    return "reject"
+                    return None
             else:
                 price_match = "perfect"
 
@@ -445,12 +575,12 @@ class RealtorService:
                 if bedrooms == target_bedrooms:
                     bedroom_match = "perfect"
                 else:
-                    return "reject"  # Strict: reject if exact bedroom count doesn't match
+                    return None  # Strict: reject if exact bedroom count doesn't match
             elif beds_min is not None and beds_max is not None:
                 if beds_min <= target_bedrooms <= beds_max:
                     bedroom_match = "perfect"  # Apartment complex has the requested bedroom count available
                 else:
-                    return "reject"  # Reject if complex doesn't offer target bedroom count
+                    return None  # Reject if complex doesn't offer target bedroom count
             else:
                 # No bedroom info available - be lenient for now but rank lower
                 bedroom_match = "acceptable"
@@ -458,18 +588,23 @@ class RealtorService:
             bedroom_match = "perfect"  # No bedroom preference specified
 
         if price_match == "perfect" and bedroom_match == "perfect":
-            return "perfect"
+            return MATCH_PERFECT
         elif (price_match in ["perfect", "good"] and bedroom_match in ["perfect", "good"]) or \
              (price_match == "perfect" and bedroom_match == "acceptable") or \
              (price_match == "good" and bedroom_match == "perfect"):
-            return "good"
+            return MATCH_GOOD
         else:
-            return "acceptable"
+            return MATCH_ACCEPTABLE
 
 
 # Global instance
 realtor_service = RealtorService()
 
+# Identical concurrent fetches (search, stream, ...) share one RapidAPI call
+_fetch_flight = SingleFlight()
+_results_cache: TTLCache = TTLCache(maxsize=1024, ttl=REALTOR_RESULTS_CACHE_TTL)
+_background_refreshes: Set[asyncio.Task] = set()
+
 
 async def fetch_realtor_listings(
     city: str,
@@ -478,8 +613,93 @@ async def fetch_realtor_listings(
     max_price: Optional[float] = None,
     search_type: str = "rent",
     property_type: Optional[str] = None,
+    refresh: bool = False,
 ):
-    return await realtor_service.fetch_realtor_listings(
+    """
+    Ranked listings, from the results cache when possible
+
+    Callers running their own stale-while-revalidate (the search endpoint)
+    pass refresh=True for their revalidation, so it reaches RapidAPI instead
+    of re-serving this cache's stale copy.
+    """
+    key = (
+        city.strip().lower(),
+        state_code.upper(),
+        bedrooms,
+        max_price,
+        search_type,
+        (property_type or "").lower()
+    )
+
+    async def fetch() -> List[RealtorListing]:
+        listings = await realtor_service.fetch_realtor_listings(
+            city=city,
+            state_code=state_code,
+            bedrooms=bedrooms,
+            max_price=max_price,
+            search_type=search_type,
+            property_type=property_type,
+            refresh=refresh,
+        )
+        _results_cache[key] = (listings, time.monotonic() + REALTOR_RESULTS_SOFT_TTL)
+        return listings
+
+    entry = None if refresh else _results_cache.get(key)
+    if entry is not None:
+        listings, fresh_until = entry
+        # Stale-while-revalidate: serve the stale copy now and refresh it off the request path
+        if time.monotonic() > fresh_until:
+            _refresh_in_background(key, fetch)
+        # A fresh list per caller so appending/slicing can't change the cached one
+        return list(listings)
+
+    return list(await _fetch_flight.do(key, fetch))
+
+
+def _refresh_in_background(key: Tuple, fetch: Callable[[], Any]) -> None:
+    """Re-run a search without blocking the caller; joins any fetch already in flight"""
+    task = asyncio.create_task(_fetch_flight.do(key, fetch))
+    _background_refreshes.add(task)  # Hold a reference until it finishes
+
+    def _done(done: asyncio.Task) -> None:
+        _background_refreshes.discard(done)
+        if not done.cancelled() and done.exception() is not None:
+            logger.warning("Background Realtor refresh failed", exc_info=done.exception())
+
+    task.add_done_callback(_done)
+
+
+async def fetch_realtor_listings_bulk(
+    queries: List[Dict[str, Any]]
+) -> List[Union[List[RealtorListing], Exception]]:
+    """
+    Run many searches (e.g. several cities) concurrently (bounded), in the order given
+
+    Args:
+        queries: fetch_realtor_listings() keyword arguments, one dict per search
+
+    Returns:
+        Ranked listings per query, or the exception raised for that query
+    """
+    sem = asyncio.Semaphore(REALTOR_BULK_CONCURRENCY)
+
+    async def fetch(query: Dict[str, Any]) -> List[RealtorListing]:
+        async with sem:
+            return await fetch_realtor_listings(**query)
+
+    return await asyncio.gather(*[fetch(query) for query in queries], return_exceptions=True)
+
+
+async def stream_realtor_listings(
+    city: str,
+    state_code: str,
+    bedrooms: Optional[int] = None,
+    max_price: Optional[float] = None,
+    search_type: str = "rent",
+    property_type: Optional[str] = None,
+) -> AsyncIterator[RealtorListing]:
+    """Yield ranked listings one at a time (ranking needs the full upstream page first)"""
+    listings = await fetch_realtor_listings(
         city=city,
         state_code=state_code,
         bedrooms=bedrooms,
@@ -487,3 +707,5 @@ async def fetch_realtor_listings(
         search_type=search_type,
         property_type=property_type,
     )
+    for listing in listings:
+        yield listing
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the local database city search
+
+Runs _search_db against an in-memory SQLite database to ensure:
+1. City prefixes match case-insensitively through the NOCASE column
+2. A prefix ending in an uppercase letter still finds its cities
+3. LIKE wildcards in the prefix are matched literally
+4. Keyset pages follow next_cursor without repeating rows
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.app.api.endpoints.search import _search_db
+from backend.app.core.database import Base
+from backend.app.models.listing import Listing
+
+CITIES = ["Austin", "austin", "AUSTIN", "Aurora", "Dallas", "Denton", "Zachary", "A_stin"]
+
+
+async def _run(queries):
+    """Seed a fresh in-memory database and run each (args, kwargs) search against it"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with session_factory() as db:
+            db.add_all(
+                Listing(title=f"{i} Main St", price=1000 + i, bedrooms=2, city=city, state="TX")
+                for i, city in enumerate(CITIES, start=1)
+            )
+            await db.commit()
+
+            return [await _search_db(db, *args, **kwargs) for args, kwargs in queries]
+    finally:
+        await engine.dispose()
+
+
+def _cities(result):
+    return sorted(row.city for row in result["listings"])
+
+
+def test_city_prefix_search():
+    aus, upper_z, lower_z, wildcard = asyncio.run(_run([
+        (("aus", None, None), {}),
+        (("Z", None, None), {}),
+        (("za", None, None), {}),
+        (("A_", None, None), {}),
+    ]))
+
+    assert _cities(aus) == ["AUSTIN", "Austin", "austin"]
+    assert _cities(upper_z) == ["Zachary"]
+    assert _cities(lower_z) == ["Zachary"]
+    assert _cities(wildcard) == ["A_stin"]
+
+
+def test_city_search_pages():
+    first, = asyncio.run(_run([(("AU", None, None), {"limit": 2})]))
+    assert first["count"] == 2
+    assert first["next_cursor"] is not None
+
+    last_id = first["listings"][-1].id
+    second, = asyncio.run(_run([(("AU", None, None), {"limit": 2, "after_id": last_id})]))
+    assert second["next_cursor"] is None
+    assert {row.id for row in first["listings"]}.isdisjoint(row.id for row in second["listings"])
+    assert len(_cities(first) + _cities(second)) == 4
+
+
+if __name__ == "__main__":
+    test_city_prefix_search()
+    test_city_search_pages()
+    print("🎉 City search tests passed")
@@ -54,12 +54,8 @@ async def test_downtown_logic():
         }
     ]
 
-    results = []
-
-    for prop in test_properties:
-        print(f"\n🏠 Testing: {prop['name']} ({prop['city']}, {prop['state']})")
-        print("-" * 40)
-
+    async def per_property(prop):
+        # The commute needs the downtown, so these two stay sequential per property
         try:
             # Find appropriate downtown
             downtown_label, downtown_coords = await downtown_service.find_appropriate_downtown(
@@ -71,25 +67,34 @@ async def test_downtown_logic():
                 prop['coords'][0], prop['coords'][1], downtown_label, downtown_coords
             )
 
-            result = {
+            return {
                 'property': prop['name'],
                 'downtown_label': downtown_label,
                 'downtown_coords': downtown_coords,
                 'commute_time': commute_time
             }
-            results.append(result)
-
-            print(f"  🏙️ Downtown: {downtown_label}")
-            if downtown_coords:
-                print(f"  📍 Coordinates: {downtown_coords}")
-            print(f"  🚗 Commute: {commute_time}")
 
         except Exception as e:
-            print(f"  ❌ Error: {e}")
-            results.append({
+            return {
                 'property': prop['name'],
                 'error': str(e)
-            })
+            }
+
+    # All properties run concurrently; output is printed afterwards in input order
+    results = await asyncio.gather(*(per_property(prop) for prop in test_properties))
+
+    for prop, result in zip(test_properties, results):
+        print(f"\n🏠 Testing: {prop['name']} ({prop['city']}, {prop['state']})")
+        print("-" * 40)
+
+        if 'error' in result:
+            print(f"  ❌ Error: {result['error']}")
+            continue
+
+        print(f"  🏙️ Downtown: {result['downtown_label']}")
+        if result['downtown_coords']:
+            print(f"  📍 Coordinates: {result['downtown_coords']}")
+        print(f"  🚗 Commute: {result['commute_time']}")
 
     # Analysis
     print("\n" + "=" * 50)
@@ -147,23 +152,30 @@ async def test_fallback_scenarios():
         {'city': 'Unknown City', 'state': 'ZZ', 'coords': (40.0, -100.0)}
     ]
 
-    for prop in fallback_tests:
-        print(f"\n🏠 Testing: {prop['city']}, {prop['state']}")
-        print("-" * 30)
-
-        try:
-            downtown_label, downtown_coords = await downtown_service.find_appropriate_downtown(
+    downtowns = await asyncio.gather(
+        *(
+            downtown_service.find_appropriate_downtown(
                 prop['city'], prop['state'], prop['coords'][0], prop['coords'][1]
             )
+            for prop in fallback_tests
+        ),
+        return_exceptions=True
+    )
 
-            print(f"  🏙️ Downtown: {downtown_label}")
-            if downtown_coords:
-                print(f"  📍 Coordinates: {downtown_coords}")
-            else:
-                print(f"  📍 Coordinates: Not available")
+    for prop, downtown in zip(fallback_tests, downtowns):
+        print(f"\n🏠 Testing: {prop['city']}, {prop['state']}")
+        print("-" * 30)
 
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
+        if isinstance(downtown, Exception):
+            print(f"  ❌ Error: {downtown}")
+            continue
+
+        downtown_label, downtown_coords = downtown
+        print(f"  🏙️ Downtown: {downtown_label}")
+        if downtown_coords:
+            print(f"  📍 Coordinates: {downtown_coords}")
+        else:
+            print(f"  📍 Coordinates: Not available")
 
 
 if __name__ == "__main__":